@@ -0,0 +1,116 @@
+"""UI-free advisor core shared by the Tk app and the headless server.
+
+Everything here works on symbols and plain data: quotes, history, indicators
+and recommendations all come from the shared cache and bar store rather than
+from widget text.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from bar_store import shared_store
+from cache import shared_cache
+from fetcher import cached_history, fetch_history, fetch_info, history_params
+from indicators import IndicatorEngine
+from recommendation import RecommendationEngine, features_for
+
+# History the technical signals are computed from
+RECOMMENDATION_PERIOD = "1y"
+
+METRICS = [
+    ("trailingPE", "P/E Ratio"),
+    ("pegRatio", "PEG Ratio"),
+    ("profitMargins", "Profit Margins"),
+    ("debtToEquity", "Debt/Equity"),
+]
+
+# Default parameters for indicators requested by name only
+INDICATOR_DEFAULTS = {
+    "sma": {"period": 50},
+    "ema": {"period": 20},
+    "rsi": {"period": 14},
+    "macd": {},
+    "bollinger": {},
+    "atr": {},
+    "vwap": {},
+}
+
+
+def format_price(value):
+    return f"${value:.2f}" if isinstance(value, (int, float)) else "N/A"
+
+
+class AdvisorCore:
+    def __init__(self, cache=shared_cache, store=shared_store, indicators=None):
+        self.cache = cache
+        self.store = store
+        self.indicator_engine = indicators or IndicatorEngine()
+        self.recommender = RecommendationEngine()
+        self.lock = threading.Lock()
+        self.recommendations = {}
+
+    def info(self, symbol):
+        return fetch_info(symbol, self.cache, self.store)
+
+    def cached_info(self, symbol):
+        # Whatever is in memory, fresh or not; never touches the network
+        fundamentals = self.cache.peek(("fundamentals", symbol))
+        quote = self.cache.peek(("quote", symbol))
+        if fundamentals is None and quote is None:
+            return None
+        return {**(fundamentals or {}), **(quote or {})}
+
+    def cached_history(self, symbol, period):
+        return cached_history(symbol, period, self.cache, self.store)
+
+    def quote(self, symbol, info=None):
+        info = info or self.info(symbol)
+        price = info.get('currentPrice', info.get('regularMarketPrice'))
+        prev_close = info.get('previousClose')
+        quote = {"symbol": symbol, "name": info.get('longName'), "price": price, "previous_close": prev_close,
+                 "change": None, "change_pct": None, "market_cap": info.get('marketCap'),
+                 "pe_ratio": info.get('trailingPE')}
+        if price is not None and prev_close:
+            quote["change"] = price - prev_close
+            quote["change_pct"] = (price - prev_close) / prev_close * 100
+        return quote
+
+    def history(self, symbol, period):
+        return fetch_history(symbol, period, self.cache, self.store)
+
+    def indicators(self, symbol, period, names=("sma", "rsi"), data=None):
+        data = self.history(symbol, period) if data is None else data
+        interval = history_params(period)[1]
+        results = {}
+        for name in names:
+            params = INDICATOR_DEFAULTS[name]
+            results[name] = self.indicator_engine.get(symbol, interval, name, data, **params)
+        return results
+
+    def features(self, symbol, info=None):
+        info = info or self.info(symbol)
+        close = self.history(symbol, RECOMMENDATION_PERIOD).close
+        return info, features_for(info, close)
+
+    def recommend(self, symbol, info=None):
+        return self.recommend_many([symbol], {symbol: info} if info else None)[symbol]
+
+    def recommend_many(self, symbols, infos=None, max_workers=16):
+        # Gather inputs in parallel, then score the whole universe in one batch
+        infos = infos or {}
+        if len(symbols) == 1:
+            gathered = {symbols[0]: self.features(symbols[0], infos.get(symbols[0]))}
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                gathered = dict(zip(symbols, pool.map(lambda s: self.features(s, infos.get(s)), symbols)))
+
+        results = {}
+        for symbol, result in self.recommender.evaluate({s: f for s, (_, f) in gathered.items()}).items():
+            info = gathered[symbol][0]
+            results[symbol] = {**result, "metrics": {key: info.get(key, 'N/A') for key, _ in METRICS}}
+        with self.lock:
+            self.recommendations.update(results)
+        return results
+
+    def last_recommendation(self, symbol):
+        with self.lock:
+            return self.recommendations.get(symbol)
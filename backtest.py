@@ -0,0 +1,172 @@
+"""Vectorized backtests of the chart overlays and recommendation signals.
+
+Bars are replayed from the on-disk bar store. Positions and PnL for each
+signal are whole-array NumPy operations (no per-bar loops), and symbols fan
+out across a process pool. Each (symbol, signal) reports total return, CAGR,
+max drawdown, Sharpe, per-trade hit rate, trade count and exposure.
+
+    python backtest.py AAPL MSFT NVDA --signals ma,rsi,macd,recommendation --fetch
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from bar_store import DEFAULT_ROOT, BarStore
+from indicators import macd, rsi, sma
+from recommendation import FEATURES, THRESHOLDS, evaluate_batch
+
+BARS_PER_YEAR = {"1d": 252, "1wk": 52, "60m": 252 * 7, "5m": 252 * 78}
+
+
+def _hold_state(enter, leave):
+    # 1 from each entry bar until the next exit bar, without looping
+    events = np.where(enter, 1, np.where(leave, -1, 0))
+    last = np.maximum.accumulate(np.where(events != 0, np.arange(len(events)), -1))
+    return np.where(last >= 0, events[np.maximum(last, 0)], 0) == 1
+
+
+def ma_signal(close, period=50):
+    average = sma(close, period)
+    return np.nan_to_num(close > average, nan=False)
+
+
+def rsi_signal(close, low=30, high=70):
+    value = rsi(close, 14)
+    return _hold_state(value < low, value > high)
+
+
+def macd_signal(close):
+    line, signal_line, _ = macd(close)
+    return np.nan_to_num(line > signal_line, nan=False)
+
+
+def recommendation_signal(close):
+    # The technical half of the recommendation engine, evaluated at every bar;
+    # historical fundamentals aren't stored, so those columns stay empty
+    matrix = np.full((len(close), len(FEATURES)), np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        matrix[:, FEATURES.index("trend")] = close / sma(close, 50) - 1
+        matrix[:, FEATURES.index("rsi")] = rsi(close, 14)
+        momentum = np.full(len(close), np.nan)
+        momentum[63:] = close[63:] / close[:-63] - 1
+        matrix[:, FEATURES.index("momentum")] = momentum
+    score, _, _ = evaluate_batch(matrix)
+    # Long on Buy or better
+    return score >= THRESHOLDS[1]
+
+
+SIGNALS = {
+    "ma": ma_signal,
+    "rsi": rsi_signal,
+    "macd": macd_signal,
+    "recommendation": recommendation_signal,
+}
+
+
+def evaluate(close, position, bars_per_year=252, cost_bps=5.0):
+    close = np.asarray(close, dtype=np.float64)
+    position = np.asarray(position, dtype=np.float64)
+    returns = np.zeros(len(close))
+    returns[1:] = close[1:] / close[:-1] - 1
+
+    # Decided on bar t's close, held over bar t+1
+    held = np.zeros(len(close))
+    held[1:] = position[:-1]
+    turnover = np.abs(np.diff(held, prepend=0.0))
+    strategy = held * returns - turnover * cost_bps / 10_000
+
+    equity = np.cumprod(1 + strategy)
+    drawdown = equity / np.maximum.accumulate(equity) - 1 if len(equity) else np.zeros(0)
+    years = len(close) / bars_per_year
+    total = equity[-1] - 1 if len(equity) else 0.0
+    std = strategy.std()
+
+    # Trades are runs of non-zero position; compound each run's returns
+    starts = np.flatnonzero((held != 0) & (np.r_[0.0, held[:-1]] == 0))
+    ends = np.flatnonzero((held != 0) & (np.r_[held[1:], 0.0] == 0)) + 1
+    growth = np.log1p(strategy)
+    cumulative = np.r_[0.0, np.cumsum(growth)]
+    trade_returns = np.expm1(cumulative[ends] - cumulative[starts])
+
+    return {
+        "total_return": float(total),
+        "cagr": float((1 + total) ** (1 / years) - 1) if years > 0 and total > -1 else -1.0,
+        "max_drawdown": float(drawdown.min()) if len(drawdown) else 0.0,
+        "sharpe": float(strategy.mean() / std * np.sqrt(bars_per_year)) if std > 0 else 0.0,
+        "hit_rate": float((trade_returns > 0).mean()) if len(trade_returns) else 0.0,
+        "trades": int(len(trade_returns)),
+        "exposure": float((held != 0).mean()) if len(held) else 0.0,
+    }
+
+
+def backtest_symbol(symbol, signals, interval="1d", root=DEFAULT_ROOT, cost_bps=5.0):
+    records, _ = BarStore(root).read(symbol, interval)
+    close = np.array(records["close"], dtype=np.float64)
+    results = {}
+    if len(close) < 2:
+        return symbol, results
+    buy_hold = evaluate(close, np.ones(len(close)), BARS_PER_YEAR.get(interval, 252), 0.0)
+    results["buy_hold"] = buy_hold
+    for name in signals:
+        position = SIGNALS[name](close)
+        results[name] = evaluate(close, position, BARS_PER_YEAR.get(interval, 252), cost_bps)
+    return symbol, results
+
+
+def _run_one(args):
+    return backtest_symbol(*args)
+
+
+def run(symbols, signals=tuple(SIGNALS), interval="1d", root=DEFAULT_ROOT, workers=None, cost_bps=5.0):
+    jobs = [(symbol, tuple(signals), interval, str(root), cost_bps) for symbol in symbols]
+    if workers == 1 or len(jobs) == 1:
+        per_symbol = dict(map(_run_one, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            per_symbol = dict(pool.map(_run_one, jobs, chunksize=max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))))
+    return {"symbols": per_symbol, "summary": summarize(per_symbol)}
+
+
+def summarize(per_symbol):
+    summary = {}
+    for results in per_symbol.values():
+        for signal, metrics in results.items():
+            for metric, value in metrics.items():
+                summary.setdefault(signal, {}).setdefault(metric, []).append(value)
+    return {
+        signal: {metric: float(np.median(values)) for metric, values in metrics.items()}
+        for signal, metrics in summary.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the advisor's signals on stored history")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--signals", default=",".join(SIGNALS), help="comma-separated subset of: " + ", ".join(SIGNALS))
+    parser.add_argument("--interval", default="1d")
+    parser.add_argument("--period", default="10y", help="history to download with --fetch (default: 10y)")
+    parser.add_argument("--fetch", action="store_true", help="download or top up history into the bar store first")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cost-bps", type=float, default=5.0, help="trading cost per position change")
+    args = parser.parse_args()
+
+    symbols = [s.upper() for s in args.symbols]
+    signals = [s.strip() for s in args.signals.split(",") if s.strip()]
+    unknown = [s for s in signals if s not in SIGNALS]
+    if unknown:
+        parser.error(f"unknown signals: {', '.join(unknown)}")
+
+    if args.fetch:
+        store = BarStore()
+        for symbol in symbols:
+            store.history(symbol, args.period, args.interval)
+
+    result = run(symbols, signals, args.interval, workers=args.workers, cost_bps=args.cost_bps)
+    print(json.dumps(result["summary"] if len(symbols) > 1 else result["symbols"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Persistent on-disk OHLCV store.
+
+Each (symbol, interval) lives in one memory-mapped .npy file of fixed-width
+records plus a small JSON sidecar. After the first download only the missing
+tail since the last stored bar is requested from the data source.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_source import BAR_COLUMNS, PERIOD_OFFSETS, YahooSource
+from gateway import Gateway
+
+DEFAULT_ROOT = Path(os.environ.get("STOCK_ADVISOR_HOME", Path.home() / ".stock_advisor")) / "bars"
+
+BAR_DTYPE = np.dtype([
+    ("ts", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+# Periods ordered by how much history they need
+PERIOD_RANK = ["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "max"]
+
+# How far back Yahoo serves each intraday interval
+MAX_LOOKBACK = {
+    "1m": pd.Timedelta(days=7),
+    "2m": pd.Timedelta(days=60),
+    "5m": pd.Timedelta(days=60),
+    "15m": pd.Timedelta(days=60),
+    "30m": pd.Timedelta(days=60),
+    "60m": pd.Timedelta(days=730),
+    "1h": pd.Timedelta(days=730),
+}
+
+
+def frame_to_records(frame):
+    records = np.empty(len(frame), dtype=BAR_DTYPE)
+    records["ts"] = frame.index.tz_convert("UTC").as_unit("ns").asi8
+    for column in BAR_COLUMNS:
+        records[column.lower()] = frame[column].to_numpy(dtype=np.float64)
+    return records
+
+
+def records_to_frame(records, tz):
+    index = pd.DatetimeIndex(records["ts"].astype("datetime64[ns]"), name="Date").tz_localize("UTC").tz_convert(tz)
+    return pd.DataFrame({column: np.array(records[column.lower()]) for column in BAR_COLUMNS}, index=index)
+
+
+def merge_records(stored, fresh):
+    # Fresh bars win on overlapping timestamps (the last stored bar may have been partial)
+    keep = stored[stored["ts"] < fresh["ts"][0]]
+    merged = np.concatenate([keep, fresh])
+    _, unique = np.unique(merged["ts"][::-1], return_index=True)
+    return merged[np.sort(len(merged) - 1 - unique)]
+
+
+class BarStore:
+    def __init__(self, root=DEFAULT_ROOT, source=None):
+        self.root = Path(root)
+        self.source = source or Gateway(YahooSource())
+        self.lock = threading.Lock()
+        self.locks = {}
+
+    def _lock(self, symbol, interval):
+        with self.lock:
+            return self.locks.setdefault((symbol, interval), threading.Lock())
+
+    def _paths(self, symbol, interval):
+        folder = self.root / interval
+        name = symbol.replace("^", "_").replace("/", "_")
+        return folder / f"{name}.npy", folder / f"{name}.json"
+
+    def read(self, symbol, interval, mmap=True):
+        data_path, meta_path = self._paths(symbol, interval)
+        if not data_path.exists() or not meta_path.exists():
+            return np.empty(0, dtype=BAR_DTYPE), {}
+        meta = json.loads(meta_path.read_text())
+        return np.load(data_path, mmap_mode="r" if mmap else None), meta
+
+    def write(self, symbol, interval, records, meta):
+        data_path, meta_path = self._paths(symbol, interval)
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to temp files and swap so a crash never leaves a torn store
+        tmp_data = data_path.with_suffix(".tmp.npy")
+        tmp_meta = meta_path.with_suffix(".tmp.json")
+        np.save(tmp_data, records)
+        tmp_meta.write_text(json.dumps(meta))
+        os.replace(tmp_data, data_path)
+        os.replace(tmp_meta, meta_path)
+
+    def history(self, symbol, period, interval):
+        with self._lock(symbol, interval):
+            # Not memory-mapped: the file may be replaced while we hold it
+            stored, meta = self.read(symbol, interval, mmap=False)
+            records, meta = self._update(symbol, period, interval, stored, meta)
+
+        frame = records_to_frame(records, meta.get("tz", "UTC"))
+        return self._window(frame, period)
+
+    def cached(self, symbol, period, interval):
+        # Whatever is already on disk, without asking the data source
+        stored, meta = self.read(symbol, interval, mmap=False)
+        frame = records_to_frame(stored, meta.get("tz", "UTC"))
+        return self._window(frame, period)
+
+    def _update(self, symbol, period, interval, stored, meta):
+        covered = meta.get("period")
+        now = pd.Timestamp.now(tz="UTC")
+        full = (
+            len(stored) == 0
+            or covered not in PERIOD_RANK
+            or PERIOD_RANK.index(covered) < PERIOD_RANK.index(period)
+            or (interval in MAX_LOOKBACK and now - pd.Timestamp(int(stored["ts"][-1]), tz="UTC") > MAX_LOOKBACK[interval])
+        )
+
+        if full:
+            fresh = self.source.history(symbol, interval, period=period)
+            if len(fresh) == 0:
+                return stored, meta
+            records = merge_records(stored, frame_to_records(fresh))
+            meta = {"period": period, "tz": str(fresh.index.tz)}
+        else:
+            # Re-request from the last stored bar so a partial bar gets completed
+            last = pd.Timestamp(int(stored["ts"][-1]), tz="UTC").tz_convert(meta.get("tz", "UTC"))
+            fresh = self.source.history(symbol, interval, start=last)
+            if len(fresh) == 0:
+                return stored, meta
+            records = merge_records(stored, frame_to_records(fresh))
+            meta = dict(meta)
+
+        meta["updated"] = now.isoformat()
+        self.write(symbol, interval, records, meta)
+        return records, meta
+
+    def _window(self, frame, period):
+        if frame.empty:
+            return frame
+        if period in ("1d", "5d"):
+            # Intraday windows count trading sessions, not calendar days
+            sessions = frame.index.normalize().unique()
+            start = sessions[-int(period[:-1]):][0]
+        elif period in PERIOD_OFFSETS:
+            start = frame.index[-1] - PERIOD_OFFSETS[period]
+        else:
+            return frame
+        return frame[frame.index >= start]
+
+
+shared_store = BarStore()
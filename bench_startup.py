@@ -0,0 +1,72 @@
+"""Cold-start benchmark for the desktop app.
+
+Seeds a throwaway STOCK_ADVISOR_HOME with offline bars for the default symbol,
+launches stock.py several times and reports, from process launch, when the
+window was mapped, when the data layer finished loading and when the first
+chart (painted from the on-disk store) appeared. Needs a display.
+
+    python bench_startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from stock import STARTUP_TARGET
+
+HERE = Path(__file__).resolve().parent
+
+
+def seed(home, symbol="AAPL", period="1mo"):
+    from bar_store import BarStore
+    from data_source import StubSource
+    from fetcher import history_params
+
+    fetch_period, interval = history_params(period)
+    BarStore(Path(home) / "bars", StubSource()).history(symbol, fetch_period, interval)
+
+
+def launch(home, timeout=60):
+    env = dict(os.environ, STOCK_ADVISOR_HOME=str(home))
+    launched = time.time()
+    output = subprocess.run(
+        [sys.executable, str(HERE / "stock.py"), "--startup-report", repr(launched)],
+        env=env, capture_output=True, text=True, timeout=timeout,
+    )
+    lines = [line for line in output.stdout.splitlines() if line.startswith("{")]
+    if not lines:
+        raise RuntimeError(f"stock.py exited without a startup report:\n{output.stderr.strip()}")
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure stock.py cold-start time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target", type=float, default=STARTUP_TARGET, help="seconds to first window (default: %(default)s)")
+    args = parser.parse_args()
+
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        parser.error("no DISPLAY; run under a desktop session or xvfb-run")
+
+    with tempfile.TemporaryDirectory() as home:
+        seed(home)
+        runs = [launch(home) for _ in range(args.runs)]
+
+    stages = sorted({stage for run in runs for stage in run})
+    result = {
+        "target": args.target,
+        "runs": runs,
+        "median": {stage: statistics.median(run[stage] for run in runs if stage in run) for stage in stages},
+    }
+    result["passed"] = result["median"].get("window", float("inf")) <= args.target
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
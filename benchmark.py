@@ -0,0 +1,279 @@
+"""Headless benchmarks for the fetch, indicator, decimation, render and portfolio hot paths.
+
+Everything runs offline against a recorded fixture of info dicts and OHLCV
+bars (see data_source.FixtureSource) and draws on matplotlib's Agg backend.
+Each stage is timed across symbol counts or history lengths, and the results
+are written as JSON so runs can be compared over time.
+
+    python benchmark.py --output before.json
+    python benchmark.py --output after.json --compare before.json
+    python benchmark.py --record fixture/ --symbols AAPL,MSFT   # capture real data once
+    python benchmark.py --fixture fixture/
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import numpy as np
+import pandas as pd
+
+from advisor import AdvisorCore
+from bar_store import BarStore
+from cache import DataCache
+from chart import ChartRenderer
+from dashboard import prepare_panel
+from data_source import FixtureSource, StubSource, record_fixture
+from downsample import lttb, minmax
+from indicators import INDICATORS, IndicatorEngine
+from portfolio import Book, Trade
+from quotes import Quote
+from series import BarSeries
+
+FIXTURE_SYMBOLS = (
+    ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "META", "NVDA", "JPM", "V", "WMT", "^GSPC", "^DJI", "^IXIC", "^RUT"]
+    + [f"SYM{i:02d}" for i in range(36)]
+)
+SYMBOL_COUNTS = [1, 10, 50]
+HISTORY_LENGTHS = [1_000, 10_000, 100_000]
+RENDER_POINTS = [250, 1_600, 10_000]
+BOOK_SIZES = [100, 1_000, 10_000]
+CHART_WIDTH = 800
+STAGES = ["fetch", "history", "indicators", "stream", "recommend", "decimate", "render", "dashboard", "portfolio"]
+
+
+def measure(fn, setup=None, repeat=5):
+    # Seconds per call. With `setup`, every call gets fresh state (cold paths)
+    if setup is None:
+        timer = timeit.Timer(fn)
+        number, _ = timer.autorange()
+        times = [t / number for t in timer.repeat(repeat, number)]
+    else:
+        number, times = 1, []
+        for _ in range(repeat):
+            state = setup()
+            start = time.perf_counter()
+            fn(state)
+            times.append(time.perf_counter() - start)
+    return {"repeat": repeat, "number": number, "min": min(times),
+            "median": statistics.median(times), "max": max(times)}
+
+
+class Suite:
+    def __init__(self, fixture, repeat=5):
+        self.source = FixtureSource(fixture)
+        self.symbols = self.source.symbols()
+        self.repeat = repeat
+        self.results = []
+        self.workdir = Path(tempfile.mkdtemp(prefix="bench-"))
+        self.runs = 0
+
+    def record(self, stage, params, timing):
+        self.results.append({"stage": stage, "params": params, **timing})
+        print(f"{stage:<11} {json.dumps(params):<45} {timing['median'] * 1e3:10.3f} ms", file=sys.stderr)
+
+    def core(self):
+        # Empty cache and empty bar store: the state on a first launch
+        self.runs += 1
+        return AdvisorCore(cache=DataCache(), store=BarStore(self.workdir / str(self.runs), self.source))
+
+    def warm_core(self, symbols, period="1mo"):
+        core = self.core()
+        for symbol in symbols:
+            core.info(symbol)
+            core.history(symbol, period)
+        return core
+
+    def close_series(self, length):
+        close = self.source.history(self.symbols[0], "1d")["Close"].to_numpy()
+        return np.resize(close, length)
+
+    def bench_fetch(self):
+        # What update_stock_data/update_chart wait on: info plus a month of bars per symbol
+        for count in SYMBOL_COUNTS:
+            symbols = self.symbols[:count]
+
+            def load(core):
+                for symbol in symbols:
+                    core.info(symbol)
+                    core.history(symbol, "1mo")
+
+            self.record("fetch", {"symbols": count, "cache": "cold"}, measure(load, self.core, self.repeat))
+            warm = self.warm_core(symbols)
+            self.record("fetch", {"symbols": count, "cache": "warm"}, measure(lambda: load(warm), repeat=self.repeat))
+
+    def bench_history(self):
+        # Switching periods on a warm symbol: window views over one cached series
+        core = self.warm_core(self.symbols[:1], "5y")
+        for period in ["1d", "1wk", "1mo", "1y", "5y"]:
+            core.history(self.symbols[0], period)
+            timing = measure(lambda: core.history(self.symbols[0], period), repeat=self.repeat)
+            self.record("history", {"period": period}, timing)
+
+    def bench_indicators(self):
+        for length in HISTORY_LENGTHS:
+            close = self.close_series(length)
+            columns = {"close": close, "high": close * 1.005, "low": close * 0.995,
+                       "volume": np.full(length, 1e6), "session": np.arange(length) // 78}
+            for name in ["sma", "ema", "rsi", "macd", "bollinger", "atr", "vwap"]:
+                indicator = INDICATORS[name]()
+                timing = measure(lambda: indicator.compute(columns), repeat=self.repeat)
+                self.record("indicators", {"name": name, "bars": length}, timing)
+
+    def bench_stream(self):
+        # One new bar on a cached series: the engine streams it instead of recomputing
+        for length in HISTORY_LENGTHS:
+            close = self.close_series(length)
+            ts = np.arange(length, dtype=np.int64) * 86_400_000_000_000
+            volume = np.full(length, 1_000_000)
+            for name in ["sma", "rsi", "macd"]:
+                def setup():
+                    series = BarSeries(ts, close, close, close, close, volume, capacity=length + 1)
+                    engine = IndicatorEngine()
+                    engine.get("BENCH", "1d", name, series)
+                    series.append(ts[-1] + 86_400_000_000_000, close[-1], close[-1], close[-1], close[-1], 1_000_000)
+                    return engine, series
+
+                timing = measure(lambda state: state[0].get("BENCH", "1d", name, state[1]), setup, self.repeat)
+                self.record("stream", {"name": name, "bars": length}, timing)
+
+    def bench_recommend(self):
+        for count in SYMBOL_COUNTS:
+            symbols = self.symbols[:count]
+            core = self.warm_core(symbols, "1y")
+            infos = {symbol: core.info(symbol) for symbol in symbols}
+            timing = measure(lambda: core.recommend_many(symbols, infos), repeat=self.repeat)
+            self.record("recommend", {"symbols": count}, timing)
+
+    def bench_decimate(self):
+        for length in HISTORY_LENGTHS:
+            x = np.arange(length, dtype=np.float64)
+            y = self.close_series(length).astype(np.float64)
+            for name, method in (("minmax", minmax), ("lttb", lttb)):
+                timing = measure(lambda: method(x, y, CHART_WIDTH), repeat=self.repeat)
+                self.record("decimate", {"method": name, "bars": length}, timing)
+
+    def bench_render(self):
+        figure = Figure(figsize=(8, 4), dpi=100)
+        canvas = FigureCanvasAgg(figure)
+        chart = ChartRenderer(figure, canvas)
+        for points in RENDER_POINTS:
+            x = 19_000 + np.arange(points, dtype=np.float64)
+            close = self.close_series(points)
+            ma = pd.Series(close).rolling(50).mean().to_numpy()
+            timing = measure(lambda: chart.render("BENCH", x, close, ma, "MA 50"), repeat=self.repeat)
+            self.record("render", {"draw": "full", "points": points}, timing)
+            timing = measure(lambda: chart.update_last(x[-1], close[-1]), repeat=self.repeat)
+            self.record("render", {"draw": "blit", "points": points}, timing)
+
+    def bench_dashboard(self):
+        # Data preparation for a 4x4 grid from a warm cache
+        symbols = self.symbols[:16]
+        core = self.warm_core(symbols)
+        timing = measure(lambda: [prepare_panel(core, symbol, "1mo", 230) for symbol in symbols], repeat=self.repeat)
+        self.record("dashboard", {"panels": len(symbols)}, timing)
+
+    def bench_portfolio(self):
+        # Mark-to-market of a whole book against one batch of quotes
+        rng = np.random.default_rng(0)
+        for size in BOOK_SIZES:
+            symbols = [f"P{i:05d}" for i in range(size)]
+            prices = rng.uniform(5, 500, size)
+            book = Book(Trade(0.0, symbol, float(rng.integers(1, 1_000)), float(price))
+                        for symbol, price in zip(symbols, prices))
+            quotes = {symbol: Quote(symbol, price * 1.01, price, price * 0.01, 1.0) for symbol, price in zip(symbols, prices)}
+            timing = measure(lambda: book.mark(quotes), repeat=self.repeat)
+            self.record("portfolio", {"positions": size}, timing)
+
+    def run(self, stages):
+        for stage in stages:
+            getattr(self, "bench_" + stage)()
+        return self.results
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parent).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "matplotlib": matplotlib.__version__,
+    }
+
+
+def compare(results, baseline, threshold=1.2):
+    # Median-to-median ratio for every measurement present in both runs
+    def key(result):
+        return result["stage"], json.dumps(result["params"], sort_keys=True)
+
+    before = {key(result): result for result in baseline["results"]}
+    rows = []
+    for result in results:
+        old = before.get(key(result))
+        if old is None:
+            continue
+        ratio = result["median"] / old["median"] if old["median"] else float("inf")
+        rows.append({"stage": result["stage"], "params": result["params"], "before": old["median"],
+                     "after": result["median"], "ratio": ratio, "regression": ratio > threshold})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the advisor's hot paths offline")
+    parser.add_argument("--fixture", help="recorded fixture directory (default: synthetic data)")
+    parser.add_argument("--record", metavar="DIR", help="capture a fixture from Yahoo into DIR and exit")
+    parser.add_argument("--symbols", help="comma-separated symbols for --record")
+    parser.add_argument("--stages", default=",".join(STAGES), help="comma-separated subset of: " + ", ".join(STAGES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--compare", metavar="JSON", help="earlier results to compare against")
+    args = parser.parse_args()
+
+    if args.record:
+        from data_source import YahooSource
+        symbols = [s.strip().upper() for s in (args.symbols or "").split(",") if s.strip()] or FIXTURE_SYMBOLS[:14]
+        record_fixture(YahooSource(), symbols, args.record)
+        return
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+
+    fixture = args.fixture
+    if fixture is None:
+        fixture = record_fixture(StubSource(), FIXTURE_SYMBOLS, tempfile.mkdtemp(prefix="fixture-"))
+
+    report = {"environment": environment(), "results": Suite(fixture, args.repeat).run(stages)}
+    if args.compare:
+        report["comparison"] = compare(report["results"], json.loads(Path(args.compare).read_text()))
+        for row in report["comparison"]:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['stage']:<11} {json.dumps(row['params']):<45} {row['ratio']:6.2f}x{flag}", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
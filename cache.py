@@ -0,0 +1,139 @@
+"""Shared in-process cache for yfinance info dicts and history frames.
+
+Entries expire on a per-kind TTL (quotes in seconds, fundamentals in hours,
+daily bars within a minute during the session and at the next open after
+it) and the cache is capped both by entry count and by approximate size,
+evicting least recently used entries first.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import market_calendar
+
+# Seconds an entry stays fresh, per kind
+QUOTE_TTL = 15
+FUNDAMENTALS_TTL = 6 * 60 * 60
+INTRADAY_TTL = 60
+
+INTRADAY_INTERVALS = {"1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h"}
+
+
+def history_ttl(interval, now=None):
+    if interval in INTRADAY_INTERVALS:
+        return INTRADAY_TTL
+    # Today's daily bar keeps moving while the market is open; after the close
+    # nothing changes until the next session opens
+    now = now or market_calendar.now()
+    if market_calendar.is_open(now):
+        return INTRADAY_TTL
+    return max((market_calendar.next_open(now) - now).total_seconds(), INTRADAY_TTL)
+
+
+def sizeof(value):
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if isinstance(value, tuple):
+        return sum(sizeof(v) for v in value)
+    if hasattr(value, "memory_usage"):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+class DataCache:
+    def __init__(self, max_entries=4096, max_bytes=512 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # key -> (expires_at, size, value), oldest use first
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def fresh(self, key):
+        # Whether get() would hit, without counting as a lookup
+        with self.lock:
+            entry = self.entries.get(key)
+            return entry is not None and entry[0] > time.monotonic()
+
+    def peek(self, key):
+        # Last stored value even if it has expired; doesn't touch LRU order or counters
+        with self.lock:
+            entry = self.entries.get(key)
+            return entry[2] if entry is not None else None
+
+    def put(self, key, value, ttl):
+        size = sizeof(value)
+        with self.lock:
+            self._remove(key)
+            self.entries[key] = (time.monotonic() + ttl, size, value)
+            self.total_bytes += size
+            self._evict()
+        return value
+
+    def replace(self, key, old, new):
+        # Swap `new` in for the entry still holding `old`, keeping its expiry; False if it has changed since
+        size = sizeof(new)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[2] is not old:
+                return False
+            self.entries[key] = (entry[0], size, new)
+            self.total_bytes += size - entry[1]
+            self._evict()
+            return True
+
+    def get_or_fetch(self, key, ttl, fetch):
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, fetch(), ttl)
+        return value
+
+    def invalidate(self, key):
+        with self.lock:
+            self._remove(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _evict(self):
+        while self.entries and (len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+
+shared_cache = DataCache()
@@ -0,0 +1,136 @@
+"""Price chart renderer that reuses its artists between updates.
+
+The price, MA and RSI lines and the RSI axis are created once and refreshed
+with set_data. The lines are animated so a live tick can be blitted over a
+cached background, and layout is only recomputed when the canvas is resized.
+"""
+import numpy as np
+
+from instrumentation import span
+
+NS_PER_DAY = 86_400 * 1_000_000_000
+
+
+def date_numbers(index):
+    # Matplotlib date numbers (days since the 1970 epoch) in the index's wall-clock time
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.as_unit("ns").asi8 / NS_PER_DAY
+
+
+class ChartRenderer:
+    def __init__(self, figure, canvas):
+        self.figure = figure
+        self.canvas = canvas
+        self.ax = figure.add_subplot(111)
+        self.ax.xaxis_date()
+        self.ax.set_xlabel("Date")
+        self.ax.set_ylabel("Price ($)")
+        self.ax.grid(True, alpha=0.3)
+        self.ax.tick_params(axis='x', labelrotation=45)
+
+        self.price_line, = self.ax.plot([], [], label='Price', color='blue', animated=True)
+        self.ma_line, = self.ax.plot([], [], label='MA', color='orange', animated=True)
+
+        # Second y-axis for RSI, hidden until the indicator is switched on
+        self.rsi_ax = self.ax.twinx()
+        self.rsi_line, = self.rsi_ax.plot([], [], label='RSI', color='purple', alpha=0.5, animated=True)
+        self.rsi_ax.axhline(70, color='red', linestyle='--', alpha=0.3)
+        self.rsi_ax.axhline(30, color='green', linestyle='--', alpha=0.3)
+        self.rsi_ax.set_ylim(0, 100)
+        self.rsi_ax.set_ylabel('RSI')
+        self.rsi_ax.set_visible(False)
+
+        self.background = None
+        self.needs_layout = True
+        self.legend_labels = None
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+        self.canvas.mpl_connect('resize_event', self.on_resize)
+
+    def render(self, title, x, close, ma=None, ma_label=None, rsi=None):
+        self.price_line.set_data(x, close)
+
+        self.ma_line.set_visible(ma is not None)
+        if ma is not None:
+            self.ma_line.set_data(x, ma)
+            self.ma_line.set_label(ma_label)
+
+        self.rsi_ax.set_visible(rsi is not None)
+        self.rsi_line.set_visible(rsi is not None)
+        if rsi is not None:
+            self.rsi_line.set_data(x, rsi)
+
+        if len(x):
+            low, high = np.nanmin(close), np.nanmax(close)
+            if ma is not None and np.isfinite(ma).any():
+                low, high = min(low, np.nanmin(ma)), max(high, np.nanmax(ma))
+            pad = (high - low) * 0.05 or abs(high) * 0.01 or 1.0
+            self.ax.set_xlim(x[0], x[-1] if x[-1] > x[0] else x[0] + 1)
+            self.ax.set_ylim(low - pad, high + pad)
+
+        self.ax.set_title(title)
+        self._update_legends(ma is not None, rsi is not None)
+
+        if self.needs_layout:
+            self.figure.tight_layout()
+            self.needs_layout = False
+        with span("chart.draw"):
+            self.canvas.draw()
+
+    def plot_width(self):
+        # Width of the plotting area in pixels, which bounds how many points are visible
+        return int(self.ax.bbox.width)
+
+    def update_last(self, x, price):
+        # Move the last price point and blit it; fall back to a full draw if it leaves the axes
+        xs, ys = self.price_line.get_data()
+        if self.background is None or not len(xs):
+            return False
+        xs = np.asarray(xs)
+        ys = np.array(ys, dtype=np.float64)
+        if x > xs[-1]:
+            xs = np.append(xs, x)
+            ys = np.append(ys, price)
+        else:
+            ys[-1] = price
+        self.price_line.set_data(xs, ys)
+
+        low, high = self.ax.get_ylim()
+        left, right = self.ax.get_xlim()
+        if not (low <= price <= high) or x > right:
+            self.ax.set_xlim(left, max(right, x))
+            self.ax.set_ylim(min(low, price), max(high, price))
+            with span("chart.draw"):
+                self.canvas.draw()
+            return True
+
+        with span("chart.blit"):
+            self.canvas.restore_region(self.background)
+            self._draw_animated()
+            self.canvas.blit(self.figure.bbox)
+        return True
+
+    def on_draw(self, event):
+        # Everything static is now on the canvas; keep it and paint the lines on top
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_animated()
+
+    def on_resize(self, event):
+        self.figure.tight_layout()
+
+    def _draw_animated(self):
+        for line, ax in ((self.price_line, self.ax), (self.ma_line, self.ax), (self.rsi_line, self.rsi_ax)):
+            if line.get_visible() and ax.get_visible():
+                ax.draw_artist(line)
+
+    def _update_legends(self, show_ma, show_rsi):
+        labels = (self.ma_line.get_label() if show_ma else None, show_rsi)
+        if labels == self.legend_labels:
+            return
+        self.legend_labels = labels
+        handles = [self.price_line] + ([self.ma_line] if show_ma else [])
+        self.ax.legend(handles=handles, loc='upper left')
+        if show_rsi:
+            self.rsi_ax.legend(handles=[self.rsi_line], loc='upper right')
+        elif self.rsi_ax.get_legend() is not None:
+            self.rsi_ax.get_legend().remove()
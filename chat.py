@@ -0,0 +1,244 @@
+"""Chat answers from the data layer, with indexed intent and symbol matching.
+
+Keywords and symbol aliases are compiled into Aho-Corasick automatons, so a
+message is matched against every keyword in one pass whatever the number of
+keywords. Symbols are picked up from cashtags ("$nflx"), known tickers and company
+names ("price of msft", "how is apple doing"), upper-case tickers ("MSFT")
+and failing those any short word that is not common English ("is nflx a
+buy?"); otherwise the question is about the selected stock.
+
+Answers come from AdvisorCore (cache, bar store, recommendations), never from
+widget text. ChatTranscript keeps a bounded history for the GUI to page
+through; it is needed before the data layer loads, so this module leaves
+importing advisor (and pandas with it) until the first answer.
+"""
+import re
+import threading
+from collections import deque, namedtuple
+
+# In priority order: the first intent with a match answers the message
+INTENTS = [
+    ("price", ["price", "current", "value", "worth", "trading at", "quote"]),
+    ("recommend", ["recommend*", "suggest*", "advice", "advise", "buy", "sell", "hold", "should i"]),
+    ("chart", ["chart*", "graph*", "technical*", "indicator*", "rsi", "moving average*"]),
+    ("news", ["news", "update*", "headline*"]),
+    ("greeting", ["hello", "hi", "hey", "good morning", "good afternoon", "good evening"]),
+    ("thanks", ["thank*", "thx", "cheers"]),
+]
+
+COMPANY_ALIASES = {
+    "apple": "AAPL", "microsoft": "MSFT", "google": "GOOGL", "alphabet": "GOOGL", "amazon": "AMZN",
+    "tesla": "TSLA", "facebook": "META", "nvidia": "NVDA", "jpmorgan": "JPM", "jp morgan": "JPM",
+    "visa": "V", "walmart": "WMT", "s&p 500": "^GSPC", "s&p": "^GSPC", "dow jones": "^DJI", "dow": "^DJI",
+    "nasdaq": "^IXIC", "russell 2000": "^RUT", "russell": "^RUT",
+}
+
+# Short words that are not tickers, in whatever case they are typed
+NOT_TICKERS = {
+    "I", "A", "AI", "OK", "PE", "EPS", "RSI", "MA", "MACD", "ETF", "IPO", "CEO", "USD", "US",
+} | set("""
+    about above after again all also am an and any are as at bad be been both but by can could day days did do
+    does doing done down each else even ever every few for from get gets go going good got great had has have he
+    help her here him his how i if in into is it its just keep know last let like long look looks low high make
+    many may maybe me might month more most much must my near need new next no nor not now of off ok okay old on
+    once one only open or other our out over own past per pls plz right same say see share she short so some
+    soon stock still such sure take tell than that the their them then there these they thing think this those
+    time to today too trend under until up very want was way we week well were what when where which while who
+    whom whose why will with would year yes yet you your
+""".upper().split()) | {word.upper() for _, keywords in INTENTS for keyword in keywords
+                        for word in keyword.rstrip("*").split()}
+
+# Cashtags in any case, and words of up to five letters ("BRK.B" included); letters joined by "&" ("S&P",
+# "AT&T") or an apostrophe ("what's") are not tickers
+CASHTAG_PATTERN = re.compile(r"\$([A-Za-z]{1,5})\b")
+WORD_PATTERN = re.compile(r"(?<![\w&'$.])([A-Za-z]{1,5}(?:\.[A-Za-z]{1,2})?)(?![\w&'])")
+
+Match = namedtuple("Match", ["start", "end", "value"])
+Entry = namedtuple("Entry", ["seq", "sender", "text"])
+
+
+class KeywordIndex:
+    # Aho-Corasick automaton. A keyword ending in "*" also matches longer words ("recommend*")
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for phrase, value in keywords:
+            self._add(phrase, value)
+        self._link()
+
+    def _add(self, phrase, value):
+        prefix = phrase.endswith("*")
+        phrase = phrase.rstrip("*").lower()
+        state = 0
+        for char in phrase:
+            nxt = self.goto[state].get(char)
+            if nxt is None:
+                nxt = self.goto[state][char] = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            state = nxt
+        self.out[state].append((len(phrase), prefix, value))
+
+    def _link(self):
+        # Breadth-first, so every failure link points at an already finished state
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(char, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+                queue.append(nxt)
+
+    def find(self, text):
+        # Whole-word matches in `text` (already lower-cased), in order of their end
+        matches = []
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for length, prefix, value in self.out[state]:
+                start = end - length
+                if _boundary(text, start - 1) and (prefix or _boundary(text, end)):
+                    matches.append(Match(start, end, value))
+        return matches
+
+
+def _boundary(text, i):
+    return i < 0 or i >= len(text) or not text[i].isalnum()
+
+
+INTENT_INDEX = KeywordIndex((keyword, intent) for intent, keywords in INTENTS for keyword in keywords)
+INTENT_ORDER = {intent: rank for rank, (intent, _) in enumerate(INTENTS)}
+
+
+def symbol_index(symbols):
+    # Tickers of three or more characters also match in lower case; shorter ones ("V") would be noise
+    aliases = dict(COMPANY_ALIASES)
+    for symbol in symbols:
+        if len(symbol.lstrip("^")) >= 3:
+            aliases[symbol.lower()] = symbol
+    return KeywordIndex(aliases.items())
+
+
+def classify(message):
+    matches = INTENT_INDEX.find(message.lower())
+    if not matches:
+        return None
+    return min((match.value for match in matches), key=INTENT_ORDER.get)
+
+
+class ChatEngine:
+    def __init__(self, core, symbols=(), news=None):
+        self.core = core
+        self.news = news
+        self.set_symbols(symbols)
+
+    def set_symbols(self, symbols):
+        # Rebuilt whole and swapped in, so readers on other threads never see it half-built
+        self.symbols = (symbol_index(symbols), frozenset(symbols))
+
+    def extract_symbol(self, message):
+        # Cashtags first, then known names and tickers, then an upper-case word in ordinary text, then any
+        # other word that is not plain English ("is nflx a buy?"). In a message typed all in capitals case
+        # says nothing, so there an unknown word needs three letters like one typed in lower case
+        cashtag = CASHTAG_PATTERN.search(message)
+        if cashtag:
+            return cashtag.group(1).upper()
+        index, known = self.symbols
+        aliases = index.find(message.lower())
+        if aliases:
+            # Prefer the longest alias ("dow jones" over "dow")
+            return max(aliases, key=lambda m: m.end - m.start).value
+        words = [match.group(1) for match in WORD_PATTERN.finditer(message)
+                 if match.group(1).upper() not in NOT_TICKERS]
+        shouting = message.isupper()
+        for word in words:
+            if word.upper() in known or (word.isupper() and not shouting):
+                return word.upper()
+        for word in words:
+            if len(word) >= 3:
+                return word.upper()
+        return None
+
+    def answer(self, message, symbol, fetch=True):
+        intent = classify(message)
+        symbol = self.extract_symbol(message) or symbol
+        if intent == "price":
+            return self.price(symbol, fetch)
+        if intent == "recommend":
+            return self.recommendation(symbol, fetch)
+        if intent == "chart":
+            return "I can help you analyze the technical indicators. " \
+                   "Try enabling RSI or moving averages from the chart controls."
+        if intent == "news":
+            return self.headlines(symbol)
+        if intent == "greeting":
+            return "Hello! How can I assist you with your stock research today?"
+        if intent == "thanks":
+            return "You're welcome! Let me know if you have any other questions."
+        return "I'm an AI stock advisor. I can help with stock analysis, " \
+               "price information, recommendations, and technical analysis. " \
+               "How can I assist you?"
+
+    def price(self, symbol, fetch):
+        from advisor import format_price
+        
+        try:
+            info = self.core.info(symbol) if fetch else self.core.cached_info(symbol)
+        except Exception:
+            info = self.core.cached_info(symbol)
+        if not info:
+            return f"I don't have a price for {symbol} yet."
+        quote = self.core.quote(symbol, info)
+        change = f" ({quote['change_pct']:+.2f}% today)" if quote["change_pct"] is not None else ""
+        return f"The current price of {symbol} is {format_price(quote['price'])}{change}."
+
+    def recommendation(self, symbol, fetch):
+        result = self.core.last_recommendation(symbol)
+        if result is None and fetch:
+            try:
+                result = self.core.recommend(symbol)
+            except Exception:
+                result = None
+        if result is None:
+            return f"I don't have a recommendation for {symbol} yet."
+        return f"Our AI recommends: {result['recommendation']} for {symbol}. {result['reason']}"
+
+    def headlines(self, symbol, count=3):
+        items = self.news.latest(symbol, count) if self.news is not None else []
+        if not items:
+            return "Recent market news is displayed at the bottom of the screen. " \
+                   f"I haven't seen any headlines for {symbol} yet."
+        return f"Latest on {symbol}: " + "; ".join(f"{item.title} ({item.publisher})" for item in items)
+
+
+class ChatTranscript:
+    # The last `capacity` messages; sequence numbers keep counting so views can tell what they show
+    def __init__(self, capacity=1000):
+        self.entries = deque(maxlen=capacity)
+        self.lock = threading.Lock()
+        self.next_seq = 0
+
+    def add(self, sender, text):
+        with self.lock:
+            entry = Entry(self.next_seq, sender, text)
+            self.next_seq += 1
+            self.entries.append(entry)
+            return entry
+
+    def before(self, seq, count):
+        # Up to `count` entries older than `seq`, oldest first
+        with self.lock:
+            if not self.entries or seq <= self.entries[0].seq:
+                return []
+            end = min(seq, self.next_seq) - self.entries[0].seq
+            return [self.entries[i] for i in range(max(0, end - count), end)]
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,176 @@
+"""Grid dashboard of small-multiple price charts.
+
+Panel data is prepared on worker threads: history comes through the shared
+cache, is decimated to the panel's pixel width and summarised, and the result
+is posted back over the message bus. On the Tk thread only panels whose data
+actually changed are redrawn, one per frame, each on its own small canvas so a
+redraw never repaints the rest of the grid.
+"""
+import threading
+import tkinter as tk
+from tkinter import ttk
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+from downsample import minmax
+from instrumentation import span
+from message_bus import BACKGROUND
+
+PanelData = namedtuple("PanelData", ["symbol", "period", "x", "y", "last", "change_pct", "stamp", "error"])
+
+PERIODS = [("1D", "1d"), ("1W", "1wk"), ("1M", "1mo"), ("3M", "3mo"), ("1Y", "1y"), ("5Y", "5y")]
+
+# One panel is drawn per frame so a full grid refresh never blocks input for long
+FRAME_MS = 33
+
+
+def prepare_panel(core, symbol, period, width):
+    data = core.history(symbol, period)
+    if data.empty:
+        return PanelData(symbol, period, None, None, None, None, None, None)
+    x = data.date_numbers()
+    y = data.close.astype(np.float64)
+    stamp = (len(data), int(data.ts[-1]), float(y[-1]))
+    keep = minmax(x, y, max(int(width), 1))
+    change_pct = (y[-1] / y[0] - 1) * 100 if y[0] else 0.0
+    return PanelData(symbol, period, x[keep], y[keep], float(y[-1]), float(change_pct), stamp, None)
+
+
+class PanelView:
+    def __init__(self, master, symbol, on_click=None):
+        self.symbol = symbol
+        self.figure = Figure(figsize=(3, 2), dpi=80)
+        self.ax = self.figure.add_axes([0.02, 0.04, 0.96, 0.78])
+        self.ax.set_xticks([])
+        self.ax.tick_params(axis='y', labelsize=7)
+        self.ax.grid(True, alpha=0.3)
+        self.line, = self.ax.plot([], [], color='blue', linewidth=1)
+        self.title = self.ax.set_title(symbol, fontsize=9)
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.widget = self.canvas.get_tk_widget()
+        if on_click is not None:
+            self.canvas.mpl_connect('button_press_event', lambda event: on_click(symbol))
+
+    def width(self):
+        return int(self.ax.bbox.width)
+
+    def render(self, panel):
+        if panel.error is not None:
+            self.line.set_data([], [])
+            self.title.set_text(f"{self.symbol}  unavailable")
+            self.title.set_color('gray')
+        elif panel.x is None:
+            self.line.set_data([], [])
+            self.title.set_text(f"{self.symbol}  no data")
+            self.title.set_color('gray')
+        else:
+            color = 'green' if panel.change_pct >= 0 else 'red'
+            self.line.set_data(panel.x, panel.y)
+            self.line.set_color(color)
+            low, high = np.nanmin(panel.y), np.nanmax(panel.y)
+            pad = (high - low) * 0.05 or abs(high) * 0.01 or 1.0
+            self.ax.set_xlim(panel.x[0], panel.x[-1] if panel.x[-1] > panel.x[0] else panel.x[0] + 1)
+            self.ax.set_ylim(low - pad, high + pad)
+            self.title.set_text(f"{self.symbol}  {panel.last:,.2f} ({panel.change_pct:+.2f}%)")
+            self.title.set_color(color)
+        with span("dashboard.draw"):
+            self.canvas.draw()
+
+
+class Dashboard:
+    def __init__(self, parent, core, message_queue, symbols, period="1mo", columns=4, max_workers=4,
+                 on_select=None, on_close=None):
+        self.core = core
+        self.message_queue = message_queue
+        self.message_queue.register("dashboard_panel", BACKGROUND, coalesce="replace", key=lambda panel: panel.symbol)
+        self.symbols = list(dict.fromkeys(symbols))
+        self.on_close = on_close
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dashboard")
+        self.lock = threading.Lock()
+        self.pending = set()
+        # symbol -> stamp of the data on screen, so unchanged panels are never redrawn
+        self.stamps = {}
+        self.dirty = OrderedDict()
+        self.render_job = None
+        self.closed = False
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("Dashboard")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        controls = ttk.Frame(self.window)
+        controls.pack(fill=tk.X, padx=10, pady=5)
+        self.period = tk.StringVar(value=period)
+        for text, value in PERIODS:
+            ttk.Radiobutton(controls, text=text, variable=self.period, value=value,
+                            command=self.refresh).pack(side=tk.LEFT, padx=5)
+
+        grid = ttk.Frame(self.window)
+        grid.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.views = {}
+        for i, symbol in enumerate(self.symbols):
+            view = PanelView(grid, symbol, on_select)
+            view.widget.grid(row=i // columns, column=i % columns, sticky="nsew", padx=2, pady=2)
+            self.views[symbol] = view
+        for column in range(min(columns, len(self.symbols))):
+            grid.columnconfigure(column, weight=1)
+        for row in range((len(self.symbols) + columns - 1) // columns):
+            grid.rowconfigure(row, weight=1)
+
+        self.refresh()
+
+    def refresh(self):
+        period = self.period.get()
+        for symbol, view in self.views.items():
+            with self.lock:
+                if (symbol, period) in self.pending:
+                    continue
+                self.pending.add((symbol, period))
+            self.executor.submit(self._prepare, symbol, period, view.width())
+
+    def _prepare(self, symbol, period, width):
+        try:
+            with span("dashboard.prepare"):
+                panel = prepare_panel(self.core, symbol, period, width)
+        except Exception as e:
+            panel = PanelData(symbol, period, None, None, None, None, None, e)
+        with self.lock:
+            self.pending.discard((symbol, period))
+        if not self.closed:
+            self.message_queue.put(("dashboard_panel", panel))
+
+    def apply(self, panel):
+        # Tk thread: queue a redraw only if this panel's data is new
+        if self.closed or panel.period != self.period.get():
+            return
+        stamp = (panel.period, panel.stamp, panel.error is not None)
+        if self.stamps.get(panel.symbol) == stamp:
+            return
+        self.stamps[panel.symbol] = stamp
+        self.dirty[panel.symbol] = panel
+        if self.render_job is None:
+            self.render_job = self.window.after(FRAME_MS, self._render_next)
+
+    def _render_next(self):
+        self.render_job = None
+        if self.closed or not self.dirty:
+            return
+        _, panel = self.dirty.popitem(last=False)
+        self.views[panel.symbol].render(panel)
+        if self.dirty:
+            self.render_job = self.window.after(FRAME_MS, self._render_next)
+
+    def close(self):
+        self.closed = True
+        if self.render_job is not None:
+            self.window.after_cancel(self.render_job)
+            self.render_job = None
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.window.destroy()
+        if self.on_close is not None:
+            self.on_close()
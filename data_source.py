@@ -0,0 +1,335 @@
+"""Pluggable market data sources.
+
+YahooSource talks to yfinance; StubSource produces deterministic synthetic
+data so the data layer can be exercised offline; FixtureSource replays info
+dicts and bars captured from either with record_fixture(), and FlakySource
+wraps any of them with injected latency and failures.
+"""
+import json
+import random
+import threading
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Bar spacing for each supported interval
+INTERVAL_DELTAS = {
+    "1m": pd.Timedelta(minutes=1),
+    "2m": pd.Timedelta(minutes=2),
+    "5m": pd.Timedelta(minutes=5),
+    "15m": pd.Timedelta(minutes=15),
+    "30m": pd.Timedelta(minutes=30),
+    "60m": pd.Timedelta(hours=1),
+    "1h": pd.Timedelta(hours=1),
+    "1d": pd.Timedelta(days=1),
+    "1wk": pd.Timedelta(weeks=1),
+}
+
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+
+def _yfinance():
+    # yfinance drags in requests, curl_cffi and friends; only load it once data is needed
+    import yfinance
+    return yfinance
+
+
+class YahooSource:
+    def __init__(self, session=None):
+        # Without an explicit session yfinance shares one pooled session across all tickers
+        self.session = session
+
+    def _ticker(self, symbol):
+        return _yfinance().Ticker(symbol, session=self.session)
+
+    def info(self, symbol):
+        return self._ticker(symbol).info
+
+    def quote(self, symbol):
+        fast = self._ticker(symbol).fast_info
+        price = fast["lastPrice"]
+        return {"currentPrice": price, "regularMarketPrice": price, "previousClose": fast["previousClose"]}
+
+    def quotes(self, symbols):
+        # One bulk download for the whole batch; the last two daily closes give price and change
+        data = _yfinance().download(list(symbols), period="5d", interval="1d", group_by="column",
+                           threads=True, progress=False, multi_level_index=True, session=self.session)
+        quotes = {}
+        if data is None or data.empty:
+            return quotes
+        closes = data["Close"]
+        for symbol in symbols:
+            if symbol not in closes:
+                continue
+            series = closes[symbol].dropna()
+            if len(series) >= 2:
+                price = float(series.iloc[-1])
+                quotes[symbol] = {"currentPrice": price, "regularMarketPrice": price,
+                                  "previousClose": float(series.iloc[-2])}
+        return quotes
+
+    def news(self, symbol, count=20):
+        return self._ticker(symbol).get_news(count=count)
+
+    def history(self, symbol, interval, period=None, start=None):
+        ticker = self._ticker(symbol)
+        if start is not None:
+            data = ticker.history(start=start, interval=interval)
+        else:
+            data = ticker.history(period=period, interval=interval)
+        if data.empty:
+            return data
+        return data[BAR_COLUMNS]
+
+
+STUB_HEADLINES = [
+    "{symbol} rally as investors weigh rate outlook",
+    "{symbol} slip after cautious guidance",
+    "Analysts raise targets on {symbol}",
+    "{symbol} trade flat ahead of earnings",
+    "Options traders eye big move in {symbol}",
+    "{symbol} hit by sector rotation",
+]
+
+
+class StubSource:
+    """Synthetic bars derived from (symbol, timestamp), so every run sees the same data."""
+
+    def __init__(self, end=None, tz="America/New_York"):
+        self.end = pd.Timestamp(end or "2024-06-28 16:00", tz=tz)
+        self.calls = []
+
+    def _seed(self, symbol):
+        return zlib.crc32(symbol.encode())
+
+    def info(self, symbol):
+        self.calls.append(("info", symbol))
+        rng = np.random.default_rng(self._seed(symbol))
+        close = self._bars(symbol, "1d", self.end - pd.DateOffset(days=7))["Close"].to_numpy()
+        return {
+            "symbol": symbol,
+            "longName": f"{symbol} Inc.",
+            "currentPrice": float(close[-1]),
+            "regularMarketPrice": float(close[-1]),
+            "previousClose": float(close[-2]),
+            "marketCap": float(rng.uniform(1e9, 3e12)),
+            "trailingPE": float(rng.uniform(5, 60)),
+            "pegRatio": float(rng.uniform(0.5, 3.5)),
+            "profitMargins": float(rng.uniform(-0.1, 0.4)),
+            "debtToEquity": float(rng.uniform(0, 250)),
+        }
+
+    def quote(self, symbol):
+        info = self.info(symbol)
+        return {k: info[k] for k in ("currentPrice", "regularMarketPrice", "previousClose")}
+
+    def quotes(self, symbols):
+        self.calls.append(("quotes", tuple(symbols)))
+        quotes = {}
+        for symbol in symbols:
+            close = self._bars(symbol, "1d", self.end - pd.DateOffset(days=7))["Close"].to_numpy()
+            quotes[symbol] = {"currentPrice": float(close[-1]), "regularMarketPrice": float(close[-1]),
+                              "previousClose": float(close[-2])}
+        return quotes
+
+    def news(self, symbol, count=20):
+        # A few stories per symbol plus market-wide ones every symbol shares, a new batch each hour
+        self.calls.append(("news", symbol))
+        hour = int(self.end.timestamp()) // 3600
+        items = []
+        for i in range(count):
+            market = i % 3 == 0
+            story = (hour - i) if market else zlib.crc32(f"{symbol}{hour - i}".encode())
+            topic = STUB_HEADLINES[story % len(STUB_HEADLINES)]
+            items.append({
+                "uuid": f"{'market' if market else symbol}-{hour - i}",
+                "title": topic.format(symbol="Stocks" if market else symbol),
+                "publisher": "Stub Wire",
+                "link": f"https://example.com/news/{'market' if market else symbol}/{hour - i}",
+                "providerPublishTime": (hour - i) * 3600,
+            })
+        return items
+
+    def _index(self, interval, start, end):
+        freq = INTERVAL_DELTAS[interval]
+        if freq >= pd.Timedelta(days=1):
+            index = pd.date_range(start.normalize(), end.normalize(), freq="B" if interval == "1d" else "W-MON", tz=end.tz)
+        else:
+            index = pd.date_range(start, end, freq=freq, tz=end.tz)
+            index = index[index.dayofweek < 5]
+            index = index[(index.time >= pd.Timestamp("09:30").time()) & (index.time < pd.Timestamp("16:00").time())]
+        return index
+
+    def history(self, symbol, interval, period=None, start=None):
+        self.calls.append(("history", symbol, interval, period, start))
+        if start is None:
+            start = self.end - PERIOD_OFFSETS.get(period, pd.DateOffset(years=1))
+        return self._bars(symbol, interval, start)
+
+    def _bars(self, symbol, interval, start):
+        end = self.end
+        start = pd.Timestamp(start)
+        if start.tzinfo is None:
+            start = start.tz_localize(end.tz)
+        index = self._index(interval, start, end)
+
+        # Prices are a pure function of the bar timestamp, so overlapping
+        # requests always agree on the bars they share
+        minutes = index.as_unit("ns").asi8 // 60_000_000_000
+        days = minutes / 1440
+        seed = self._seed(symbol)
+        base = 20 + seed % 400
+        phase = 2 * np.pi * (seed % 97) / 97
+        noise = (minutes * 2654435761 + seed) % 1000 / 1000 - 0.5
+        # Slow drift plus a few market-like cycles and a little bar-to-bar noise
+        close = base * np.exp(0.05 * (days - 19_000) / 365) * (
+            1 + 0.15 * np.sin(2 * np.pi * days / 180 + phase)
+            + 0.06 * np.sin(2 * np.pi * days / 41 + 2 * phase)
+            + 0.02 * np.sin(2 * np.pi * days / 7.3)
+            + 0.01 * noise
+        )
+        spread = close * 0.005
+        frame = pd.DataFrame({
+            "Open": close - spread * np.sin(minutes / 11.0),
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Volume": (1e6 * (1.5 + np.sin(minutes / 13.0))).astype(np.int64),
+        }, index=index)
+        frame.index.name = "Date"
+        return frame
+
+
+# Series captured by record_fixture: interval -> period
+FIXTURE_SERIES = {"1d": "5y", "60m": "5d", "5m": "5d"}
+
+
+def record_fixture(source, symbols, path, series=FIXTURE_SERIES):
+    # info.json holds the info dicts and each series' timezone; bars.npz the bars
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    infos, news, zones, arrays = {}, {}, {}, {}
+    for symbol in symbols:
+        infos[symbol] = source.info(symbol)
+        news[symbol] = source.news(symbol)
+        for interval, period in series.items():
+            frame = source.history(symbol, interval, period=period)
+            if frame is None or frame.empty:
+                continue
+            name = f"{symbol}|{interval}"
+            zones[name] = str(frame.index.tz or "UTC")
+            arrays[name + "|ts"] = frame.index.as_unit("ns").asi8
+            arrays[name + "|bars"] = frame[BAR_COLUMNS].to_numpy(dtype=np.float64)
+    (path / "info.json").write_text(json.dumps({"info": infos, "news": news, "tz": zones}, default=str))
+    np.savez(path / "bars.npz", **arrays)
+    return path
+
+
+class FixtureSource:
+    """Replays a recorded fixture; never touches the network."""
+
+    def __init__(self, path):
+        path = Path(path)
+        recorded = json.loads((path / "info.json").read_text())
+        self.infos = recorded["info"]
+        self.stories = recorded.get("news", {})
+        self.zones = recorded["tz"]
+        self.arrays = np.load(path / "bars.npz")
+        self.frames = {}
+
+    def symbols(self):
+        return list(self.infos)
+
+    def info(self, symbol):
+        return dict(self.infos.get(symbol, {}))
+
+    def quote(self, symbol):
+        info = self.infos.get(symbol, {})
+        return {k: info[k] for k in ("currentPrice", "regularMarketPrice", "previousClose") if k in info}
+
+    def quotes(self, symbols):
+        return {symbol: self.quote(symbol) for symbol in symbols if symbol in self.infos}
+
+    def news(self, symbol, count=20):
+        return list(self.stories.get(symbol, []))[:count]
+
+    def _frame(self, symbol, interval):
+        name = f"{symbol}|{interval}"
+        frame = self.frames.get(name)
+        if frame is None:
+            if name not in self.zones:
+                return pd.DataFrame(columns=BAR_COLUMNS, index=pd.DatetimeIndex([], tz="UTC", name="Date"))
+            index = pd.DatetimeIndex(self.arrays[name + "|ts"], name="Date").tz_localize("UTC").tz_convert(self.zones[name])
+            frame = self.frames[name] = pd.DataFrame(self.arrays[name + "|bars"], index=index, columns=BAR_COLUMNS)
+        return frame
+
+    def history(self, symbol, interval, period=None, start=None):
+        frame = self._frame(symbol, interval)
+        if frame.empty:
+            return frame
+        if start is not None:
+            start = pd.Timestamp(start)
+            if start.tzinfo is None:
+                start = start.tz_localize(frame.index.tz)
+            return frame[frame.index >= start]
+        if period in PERIOD_OFFSETS:
+            return frame[frame.index >= frame.index[-1] - PERIOD_OFFSETS[period]]
+        return frame
+
+
+class FlakySource:
+    """Another source behind injected latency and random failures, for testing the gateway offline."""
+
+    def __init__(self, source=None, latency=0.05, jitter=0.02, error_rate=0.2, seed=0):
+        self.source = source or StubSource()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        # Set to fail every call, e.g. to simulate an outage
+        self.down = False
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+
+    def _call(self, method, *args, **kwargs):
+        with self.lock:
+            self.calls += 1
+            delay = max(0.0, self.random.gauss(self.latency, self.jitter))
+            fail = self.down or self.random.random() < self.error_rate
+            if fail:
+                self.failures += 1
+        time.sleep(delay)
+        if fail:
+            raise ConnectionError(f"Injected upstream failure in {method}")
+        return getattr(self.source, method)(*args, **kwargs)
+
+    def info(self, symbol):
+        return self._call("info", symbol)
+
+    def quote(self, symbol):
+        return self._call("quote", symbol)
+
+    def quotes(self, symbols):
+        return self._call("quotes", symbols)
+
+    def news(self, symbol, count=20):
+        return self._call("news", symbol, count)
+
+    def history(self, symbol, interval, period=None, start=None):
+        return self._call("history", symbol, interval, period=period, start=start)
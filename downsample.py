@@ -0,0 +1,86 @@
+"""Decimation of long series down to what the chart can actually show.
+
+minmax keeps the lowest and highest point in every pixel column, so peaks and
+troughs survive exactly; lttb (Largest-Triangle-Three-Buckets) keeps the
+visually most significant point per bucket. Both return indices, so overlays
+can be sampled at the same positions as the price line.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def minmax(x, y, buckets):
+    n = len(x)
+    if n <= 2 * buckets:
+        return np.arange(n)
+
+    # Equal-width buckets along x, i.e. one per pixel column
+    edges = np.linspace(x[0], x[-1], buckets + 1)[1:-1]
+    bucket = np.searchsorted(edges, x, side="right")
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    owner = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+
+    lows = np.fmin.reduceat(y, starts)
+    highs = np.fmax.reduceat(y, starts)
+    _, first_low = np.unique(owner[y == lows[owner]], return_index=True)
+    _, first_high = np.unique(owner[y == highs[owner]], return_index=True)
+
+    keep = np.concatenate([
+        np.flatnonzero(y == lows[owner])[first_low],
+        np.flatnonzero(y == highs[owner])[first_high],
+        [0, n - 1],
+    ])
+    return np.unique(keep)
+
+
+def lttb(x, y, threshold):
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    selected = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        # Average of the next bucket is the third corner of the triangle
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[stop:next_stop].mean() if next_stop > stop else x[-1]
+        avg_y = y[stop:next_stop].mean() if next_stop > stop else y[-1]
+
+        ax, ay = x[selected], y[selected]
+        area = np.abs((ax - avg_x) * (y[start:stop] - ay) - (ax - x[start:stop]) * (avg_y - ay))
+        selected = start + int(np.nanargmax(area)) if np.isfinite(area).any() else start
+        keep[i + 1] = selected
+    return keep
+
+
+METHODS = {"minmax": minmax, "lttb": lttb}
+
+
+class Decimator:
+    def __init__(self, method="minmax", max_entries=64):
+        self.method = METHODS[method]
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def indices(self, key, x, y, width):
+        # Cached per (key, width); reused while the series is unchanged
+        width = max(int(width), 1)
+        stamp = (len(x), x[-1] if len(x) else None, y[-1] if len(y) else None)
+        with self.lock:
+            entry = self.entries.get((key, width))
+            if entry is not None and entry[0] == stamp:
+                self.entries.move_to_end((key, width))
+                return entry[1]
+
+        picked = self.method(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64), width)
+        with self.lock:
+            self.entries[(key, width)] = (stamp, picked)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return picked
@@ -0,0 +1,211 @@
+"""Background fetch pipeline for yfinance data.
+
+Requests are keyed by (symbol, kind, period) and run on a small worker pool so
+the Tk event loop never waits on the network. Finished results are posted back
+through the app's message queue as ("fetch_result", FetchResult). Data is
+served from the shared cache whenever it is still fresh, and bars come from
+the on-disk store, which only downloads the tail it is missing.
+"""
+import itertools
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import market_calendar
+from bar_store import PERIOD_RANK, shared_store
+from cache import FUNDAMENTALS_TTL, INTRADAY_INTERVALS, QUOTE_TTL, history_ttl, shared_cache
+from data_source import INTERVAL_DELTAS
+from instrumentation import span
+from series import BarSeries
+
+FetchKey = namedtuple("FetchKey", ["symbol", "kind", "period"])
+FetchResult = namedtuple("FetchResult", ["key", "data", "error"])
+
+# Chart period -> (download period, bar interval)
+PERIOD_INTERVALS = {
+    "1d": ("1d", "5m"),
+    "1wk": ("5d", "60m"),
+    "5d": ("5d", "60m"),
+}
+
+QUOTE_FIELDS = ("currentPrice", "regularMarketPrice", "previousClose")
+
+
+def history_params(period):
+    return PERIOD_INTERVALS.get(period, (period, "1d"))
+
+
+def info_is_fresh(symbol, cache=shared_cache):
+    # Fundamentals only; quotes are kept fresh by the batched quote service
+    return cache.fresh(("fundamentals", symbol))
+
+
+def history_is_fresh(symbol, period, cache=shared_cache):
+    fetch_period, interval = history_params(period)
+    key = ("history", symbol, interval)
+    if not cache.fresh(key):
+        return False
+    return PERIOD_RANK.index(cache.peek(key)[0]) >= PERIOD_RANK.index(fetch_period)
+
+
+def fetch_info(symbol, cache=shared_cache, store=shared_store):
+    fundamentals = cache.get(("fundamentals", symbol))
+    if fundamentals is None:
+        try:
+            info = store.source.info(symbol)
+        except Exception:
+            # Upstream is failing: serve whatever we had, however old
+            stale = cache.peek(("fundamentals", symbol))
+            if stale is None:
+                raise
+            return {**stale, **(cache.peek(("quote", symbol)) or {})}
+        cache.put(("fundamentals", symbol), info, FUNDAMENTALS_TTL)
+        cache.put(("quote", symbol), {k: info[k] for k in QUOTE_FIELDS if k in info}, QUOTE_TTL)
+        return info
+
+    # Fundamentals are still fresh, so only the price needs refreshing
+    try:
+        quote = cache.get_or_fetch(("quote", symbol), QUOTE_TTL, lambda: store.source.quote(symbol))
+    except Exception:
+        quote = cache.peek(("quote", symbol)) or {}
+    return {**fundamentals, **quote}
+
+
+def fetch_history(symbol, period, cache=shared_cache, store=shared_store):
+    # One compact series per (symbol, interval); shorter periods are views into it
+    fetch_period, interval = history_params(period)
+    key = ("history", symbol, interval)
+    cached = cache.get(key)
+    if cached is not None and PERIOD_RANK.index(cached[0]) >= PERIOD_RANK.index(fetch_period):
+        return cached[1].window(fetch_period)
+
+    # Refresh at least as much history as was held before
+    previous = cache.peek(key)
+    if previous is not None and PERIOD_RANK.index(previous[0]) > PERIOD_RANK.index(fetch_period):
+        fetch_period = previous[0]
+
+    try:
+        with span("fetch.download"):
+            data = store.history(symbol, fetch_period, interval)
+    except Exception:
+        # Upstream is failing: fall back to stale bars in memory, then on disk
+        if previous is not None:
+            return previous[1].window(history_params(period)[0])
+        stale = cached_history(symbol, period, cache, store)
+        if stale.empty:
+            raise
+        return stale
+    if interval in INTRADAY_INTERVALS and not data.empty:
+        # For intraday, we need to filter out pre/post market
+        data = data.between_time('09:30', '16:00')
+    series = BarSeries.from_frame(data)
+    cache.put(key, (fetch_period, series), history_ttl(interval))
+    return series.window(history_params(period)[0])
+
+
+def cached_history(symbol, period, cache=shared_cache, store=shared_store):
+    # Bars already in memory or on disk, stale or not; never touches the network
+    fetch_period, interval = history_params(period)
+    cached = cache.peek(("history", symbol, interval))
+    if cached is not None and PERIOD_RANK.index(cached[0]) >= PERIOD_RANK.index(fetch_period):
+        return cached[1].window(fetch_period)
+    data = store.cached(symbol, fetch_period, interval)
+    if interval in INTRADAY_INTERVALS and not data.empty:
+        data = data.between_time('09:30', '16:00')
+    return BarSeries.from_frame(data)
+
+
+def bar_start(series, interval, ts):
+    # The bar a trade at `ts` (ns, UTC) falls in, on the grid of the last bar held (Yahoo's 60m bars
+    # start at :30). Intraday bars only cover the session, so trades outside it have none
+    when = pd.Timestamp(ts, tz="UTC").tz_convert(series.tz)
+    if interval not in INTRADAY_INTERVALS:
+        return when.normalize().value
+    if not market_calendar.OPEN_TIME <= when.time() < market_calendar.CLOSE_TIME:
+        return None
+    # Counted in wall-clock time, so a DST change since the last bar doesn't shift the grid
+    delta = INTERVAL_DELTAS[interval].value
+    last = pd.Timestamp(int(series.ts[-1]), tz="UTC").tz_convert(series.tz).tz_localize(None).value
+    wall = when.tz_localize(None).value
+    return pd.Timestamp(last + (wall - last) // delta * delta).tz_localize(series.tz).value
+
+
+def fold_tick(symbol, period, ts, price, cache=shared_cache):
+    # Fold a live trade into the cached bars. The fold goes into a copy that replaces the cached
+    # series, so workers reading the old one never see it change. Returns the window for `period`,
+    # or None when the trade has no bar there or the cache moved on meanwhile
+    fetch_period, interval = history_params(period)
+    key = ("history", symbol, interval)
+    cached = cache.peek(key)
+    if cached is None or cached[1].empty:
+        return None
+    bar = bar_start(cached[1], interval, ts)
+    folded = cached[1].fold_tick(bar, price) if bar is not None else None
+    if folded is None or not cache.replace(key, cached, (cached[0], folded)):
+        return None
+    return folded.window(fetch_period)
+
+
+def run_fetch(key):
+    if key.kind == "info":
+        return fetch_info(key.symbol)
+    if key.kind == "history":
+        return fetch_history(key.symbol, key.period)
+    raise ValueError(f"Unknown fetch kind: {key.kind}")
+
+
+class FetchPipeline:
+    def __init__(self, message_queue, max_workers=4, handlers=None):
+        self.message_queue = message_queue
+        # Extra request kinds beyond info/history, as kind -> callable(key)
+        self.handlers = handlers or {}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+        self.lock = threading.Lock()
+        self.tokens = itertools.count()
+        # key -> (token, future) for every request that has not been delivered yet
+        self.in_flight = {}
+
+    def submit(self, symbol, kind, period=None):
+        key = FetchKey(symbol, kind, period)
+        with self.lock:
+            # An identical request is already on its way
+            if key in self.in_flight:
+                return key
+            token = next(self.tokens)
+            future = self.executor.submit(self._run, key, token)
+            self.in_flight[key] = (token, future)
+        return key
+
+    def pending(self):
+        with self.lock:
+            return len(self.in_flight)
+
+    def cancel_stale(self, symbol):
+        # Drop everything that isn't for the symbol the user is looking at now.
+        # Queued jobs are cancelled outright; running ones are discarded on completion.
+        with self.lock:
+            for key in [k for k in self.in_flight if k.symbol != symbol]:
+                _, future = self.in_flight.pop(key)
+                future.cancel()
+
+    def _run(self, key, token):
+        try:
+            handler = self.handlers.get(key.kind, run_fetch)
+            with span("fetch." + key.kind):
+                result = FetchResult(key, handler(key), None)
+        except Exception as e:
+            result = FetchResult(key, None, e)
+
+        with self.lock:
+            entry = self.in_flight.get(key)
+            if entry is None or entry[0] != token:
+                return
+            del self.in_flight[key]
+        self.message_queue.put(("fetch_result", result))
+
+    def shutdown(self):
+        with self.lock:
+            self.in_flight.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
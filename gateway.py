@@ -0,0 +1,175 @@
+"""Resilient front door for an upstream market data source.
+
+Gateway wraps any source (YahooSource, StubSource, FlakySource) and exposes
+the same info/quote/quotes/news/history methods:
+
+- identical concurrent calls share one upstream request (single-flight)
+- upstream requests draw from a token bucket, so bursts are smoothed out
+  instead of getting us throttled
+- failures are retried with exponential backoff and full jitter
+- after repeated failures the gateway fails fast for a cool-down period, so
+  callers fall back to stale cached data (see fetcher.py) without waiting on
+  retries
+"""
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+# Errors that won't go away by asking again
+PERMANENT_ERRORS = (KeyError, ValueError, TypeError, NotImplementedError)
+
+
+class UpstreamUnavailable(Exception):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.waited = 0.0
+
+    def acquire(self, tokens=1):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                delay = (tokens - self.tokens) / self.rate
+                self.waited += delay
+            time.sleep(delay)
+
+
+class SingleFlight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.shared = 0
+
+    def do(self, key, fn):
+        # The first caller runs fn; everyone arriving meanwhile gets its result or exception
+        with self.lock:
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                future = self.calls[key] = Future()
+            else:
+                self.shared += 1
+        if leader:
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self.lock:
+                    del self.calls[key]
+        return future.result()
+
+
+class Gateway:
+    def __init__(self, source, rate=5.0, burst=10, retries=3, backoff=0.5, max_backoff=8.0,
+                 failure_threshold=5, cooldown=30.0, seed=None):
+        self.source = source
+        self.bucket = TokenBucket(rate, burst)
+        self.flight = SingleFlight()
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.requests = 0
+        self.upstream = 0
+        self.retried = 0
+        self.failures = 0
+        self.rejected = 0
+
+    def info(self, symbol):
+        return self._request(("info", symbol), "info", symbol)
+
+    def quote(self, symbol):
+        return self._request(("quote", symbol), "quote", symbol)
+
+    def quotes(self, symbols):
+        symbols = list(symbols)
+        return self._request(("quotes", tuple(symbols)), "quotes", symbols)
+
+    def news(self, symbol, count=20):
+        return self._request(("news", symbol, count), "news", symbol, count)
+
+    def history(self, symbol, interval, period=None, start=None):
+        return self._request(("history", symbol, interval, period, start), "history", symbol, interval,
+                             period=period, start=start)
+
+    def _request(self, key, method, *args, **kwargs):
+        with self.lock:
+            self.requests += 1
+        return self.flight.do(key, lambda: self._call(method, *args, **kwargs))
+
+    def _call(self, method, *args, **kwargs):
+        for attempt in range(self.retries + 1):
+            with self.lock:
+                if time.monotonic() < self.open_until:
+                    self.rejected += 1
+                    raise UpstreamUnavailable(f"Upstream is failing; pausing requests for up to {self.cooldown:.0f}s")
+            self.bucket.acquire()
+            try:
+                with self.lock:
+                    self.upstream += 1
+                result = getattr(self.source, method)(*args, **kwargs)
+            except PERMANENT_ERRORS:
+                raise
+            except Exception:
+                with self.lock:
+                    self.failures += 1
+                    self.consecutive_failures += 1
+                    if self.consecutive_failures >= self.failure_threshold:
+                        self.open_until = time.monotonic() + self.cooldown
+                    last = attempt == self.retries
+                    if not last:
+                        self.retried += 1
+                if last:
+                    raise
+                # Full jitter keeps retries from many callers from lining up
+                time.sleep(self.random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+            else:
+                with self.lock:
+                    self.consecutive_failures = 0
+                return result
+
+    def check(self):
+        # Raises while upstream is failing (cooling down, or the last request failed), so periodic
+        # pollers can back off without making a request to find out
+        with self.lock:
+            if time.monotonic() < self.open_until or self.consecutive_failures:
+                raise UpstreamUnavailable(f"Upstream is failing ({self.consecutive_failures} errors in a row)")
+
+    def headroom(self):
+        # Share of the request budget currently available, 0..1
+        with self.bucket.lock:
+            tokens = min(self.bucket.capacity,
+                         self.bucket.tokens + (time.monotonic() - self.bucket.updated) * self.bucket.rate)
+        return tokens / self.bucket.capacity
+
+    def stats(self):
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "upstream": self.upstream,
+                "coalesced": self.flight.shared,
+                "retried": self.retried,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "throttled_seconds": self.bucket.waited,
+                "available": time.monotonic() >= self.open_until,
+            }
@@ -0,0 +1,442 @@
+"""Technical indicators: NumPy kernels, streaming updaters and a result cache.
+
+The batch kernels compute a whole history at once. Each indicator class also
+keeps just enough state to absorb one new bar in O(1), and IndicatorEngine
+caches results per (symbol, interval, indicator, params). Toggling an overlay
+or appending a live bar therefore never rescans the full history.
+"""
+import math
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from instrumentation import span
+from series import NS_PER_DAY, BarSeries
+
+
+def _ewma(x, alpha, seed):
+    # y[t] = (1 - alpha) * y[t-1] + alpha * x[t], starting from y[-1] = seed.
+    # Solved in closed form per block; blocks are sized so the decay powers stay finite.
+    x = np.asarray(x, dtype=np.float64)
+    out = np.empty_like(x)
+    decay = 1.0 - alpha
+    block = len(x) if decay == 0 else max(1, min(len(x), int(25 / -math.log(decay))))
+    carry = seed
+    for start in range(0, len(x), block):
+        chunk = x[start:start + block]
+        powers = decay ** np.arange(1, len(chunk) + 1)
+        out[start:start + len(chunk)] = powers * (carry + alpha * np.cumsum(chunk / powers))
+        carry = out[start + len(chunk) - 1]
+    return out
+
+
+def _nan(n):
+    return np.full(n, np.nan)
+
+
+def sma(values, period):
+    values = np.asarray(values, dtype=np.float64)
+    out = _nan(len(values))
+    if period < 1 or len(values) < period:
+        return out
+    sums = np.cumsum(np.insert(values, 0, 0.0))
+    out[period - 1:] = (sums[period:] - sums[:-period]) / period
+    return out
+
+
+def ema(values, period):
+    # Seeded with the simple average of the first `period` values
+    values = np.asarray(values, dtype=np.float64)
+    out = _nan(len(values))
+    if len(values) < period:
+        return out
+    seed = values[:period].mean()
+    out[period - 1] = seed
+    out[period:] = _ewma(values[period:], 2.0 / (period + 1), seed)
+    return out
+
+
+def wilder(values, period):
+    # Wilder smoothing: EMA with alpha = 1 / period
+    values = np.asarray(values, dtype=np.float64)
+    out = _nan(len(values))
+    if len(values) < period:
+        return out
+    seed = values[:period].mean()
+    out[period - 1] = seed
+    out[period:] = _ewma(values[period:], 1.0 / period, seed)
+    return out
+
+
+def rsi(close, period=14):
+    close = np.asarray(close, dtype=np.float64)
+    out = _nan(len(close))
+    if len(close) <= period:
+        return out
+    delta = np.diff(close)
+    avg_gain = wilder(np.clip(delta, 0, None), period)
+    avg_loss = wilder(np.clip(-delta, 0, None), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[1:] = np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / avg_loss))
+    out[1:period] = np.nan
+    return out
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = _nan(len(line))
+    valid = np.flatnonzero(~np.isnan(line))
+    if len(valid):
+        signal_line[valid[0]:] = ema(line[valid[0]:], signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close, period=20, width=2.0):
+    close = np.asarray(close, dtype=np.float64)
+    mid = sma(close, period)
+    # Shift by the first value so the running sum of squares keeps its precision
+    shifted = close - (close[0] if len(close) else 0.0)
+    mean_sq = sma(shifted ** 2, period)
+    mean = sma(shifted, period)
+    std = np.sqrt(np.maximum(mean_sq - mean ** 2, 0))
+    return mid + width * std, mid, mid - width * std
+
+
+def true_range(high, low, close):
+    high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+    prev_close = np.roll(close, 1)
+    tr = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+    if len(tr):
+        tr[0] = high[0] - low[0]
+    return tr
+
+
+def atr(high, low, close, period=14):
+    return wilder(true_range(high, low, close), period)
+
+
+def vwap(high, low, close, volume, sessions=None):
+    # Cumulative VWAP, restarting at each change in `sessions` when given
+    typical = (np.asarray(high, dtype=np.float64) + low + close) / 3
+    volume = np.asarray(volume, dtype=np.float64)
+    pv = np.cumsum(typical * volume)
+    vol = np.cumsum(volume)
+    if sessions is not None and len(volume):
+        sessions = np.asarray(sessions)
+        starts = np.flatnonzero(np.r_[True, sessions[1:] != sessions[:-1]])
+        owner = np.repeat(starts, np.diff(np.r_[starts, len(volume)]))
+        pv = pv - np.r_[0.0, pv][owner]
+        vol = vol - np.r_[0.0, vol][owner]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(vol > 0, pv / vol, np.nan)
+
+
+class SMA:
+    outputs = ("sma",)
+
+    def __init__(self, period=50):
+        self.period = period
+
+    def compute(self, bars):
+        close = bars["close"]
+        self.window = deque(close[-self.period:], maxlen=self.period)
+        self.total = float(np.sum(self.window))
+        return {"sma": sma(close, self.period)}
+
+    def update(self, bar):
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(bar["close"])
+        self.total += bar["close"]
+        return {"sma": self.total / self.period if len(self.window) == self.period else np.nan}
+
+
+class EMA:
+    outputs = ("ema",)
+
+    def __init__(self, period=20):
+        self.period = period
+
+    def compute(self, bars):
+        out = ema(bars["close"], self.period)
+        self.warmup = list(bars["close"]) if len(out) < self.period else None
+        self.value = out[-1] if len(out) else np.nan
+        return {"ema": out}
+
+    def update(self, bar):
+        if self.warmup is not None:
+            self.warmup.append(bar["close"])
+            if len(self.warmup) < self.period:
+                return {"ema": np.nan}
+            self.value = float(np.mean(self.warmup))
+            self.warmup = None
+        else:
+            alpha = 2.0 / (self.period + 1)
+            self.value += alpha * (bar["close"] - self.value)
+        return {"ema": self.value}
+
+
+class RSI:
+    outputs = ("rsi",)
+
+    def __init__(self, period=14):
+        self.period = period
+
+    def compute(self, bars):
+        close = np.asarray(bars["close"], dtype=np.float64)
+        self.last_close = close[-1] if len(close) else None
+        delta = np.diff(close)
+        gains = wilder(np.clip(delta, 0, None), self.period)
+        losses = wilder(np.clip(-delta, 0, None), self.period)
+        self.avg_gain = gains[-1] if len(gains) else np.nan
+        self.avg_loss = losses[-1] if len(losses) else np.nan
+        self.warmup = list(delta) if len(delta) < self.period else None
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = np.where(losses == 0, 100.0, 100 - 100 / (1 + gains / losses))
+        return {"rsi": np.r_[np.nan, np.where(np.isnan(gains), np.nan, out)] if len(close) else out}
+
+    def update(self, bar):
+        close = bar["close"]
+        if self.last_close is None:
+            self.last_close = close
+            return {"rsi": np.nan}
+        delta = close - self.last_close
+        self.last_close = close
+        if self.warmup is not None:
+            self.warmup.append(delta)
+            if len(self.warmup) < self.period:
+                return {"rsi": np.nan}
+            warm = np.asarray(self.warmup)
+            self.avg_gain = np.clip(warm, 0, None).mean()
+            self.avg_loss = np.clip(-warm, 0, None).mean()
+            self.warmup = None
+        else:
+            self.avg_gain += (max(delta, 0.0) - self.avg_gain) / self.period
+            self.avg_loss += (max(-delta, 0.0) - self.avg_loss) / self.period
+        if self.avg_loss == 0:
+            return {"rsi": 100.0}
+        return {"rsi": 100 - 100 / (1 + self.avg_gain / self.avg_loss)}
+
+
+class MACD:
+    outputs = ("macd", "signal", "histogram")
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+
+    def compute(self, bars):
+        line, signal_line, hist = macd(bars["close"], self.fast.period, self.slow.period, self.signal.period)
+        self.fast.compute(bars)
+        self.slow.compute(bars)
+        self.signal.compute({"close": line[~np.isnan(line)]})
+        return {"macd": line, "signal": signal_line, "histogram": hist}
+
+    def update(self, bar):
+        line = self.fast.update(bar)["ema"] - self.slow.update(bar)["ema"]
+        if np.isnan(line):
+            return {"macd": np.nan, "signal": np.nan, "histogram": np.nan}
+        signal_value = self.signal.update({"close": line})["ema"]
+        return {"macd": line, "signal": signal_value, "histogram": line - signal_value}
+
+
+class Bollinger:
+    outputs = ("upper", "middle", "lower")
+
+    def __init__(self, period=20, width=2.0):
+        self.period = period
+        self.width = width
+
+    def compute(self, bars):
+        close = bars["close"]
+        self.window = deque(close[-self.period:], maxlen=self.period)
+        upper, mid, lower = bollinger(close, self.period, self.width)
+        return {"upper": upper, "middle": mid, "lower": lower}
+
+    def update(self, bar):
+        self.window.append(bar["close"])
+        if len(self.window) < self.period:
+            return {"upper": np.nan, "middle": np.nan, "lower": np.nan}
+        window = np.fromiter(self.window, dtype=np.float64, count=self.period)
+        mid = window.mean()
+        std = window.std()
+        return {"upper": mid + self.width * std, "middle": mid, "lower": mid - self.width * std}
+
+
+class ATR:
+    outputs = ("atr",)
+
+    def __init__(self, period=14):
+        self.period = period
+
+    def compute(self, bars):
+        tr = true_range(bars["high"], bars["low"], bars["close"])
+        out = wilder(tr, self.period)
+        self.prev_close = bars["close"][-1] if len(tr) else None
+        self.warmup = list(tr) if len(tr) < self.period else None
+        self.value = out[-1] if len(out) else np.nan
+        return {"atr": out}
+
+    def update(self, bar):
+        high, low = bar["high"], bar["low"]
+        if self.prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = bar["close"]
+        if self.warmup is not None:
+            self.warmup.append(tr)
+            if len(self.warmup) < self.period:
+                return {"atr": np.nan}
+            self.value = float(np.mean(self.warmup))
+            self.warmup = None
+        else:
+            self.value += (tr - self.value) / self.period
+        return {"atr": self.value}
+
+
+class VWAP:
+    outputs = ("vwap",)
+
+    def compute(self, bars):
+        sessions = bars.get("session")
+        out = vwap(bars["high"], bars["low"], bars["close"], bars["volume"], sessions)
+        self.session = sessions[-1] if sessions is not None and len(sessions) else None
+        typical = (np.asarray(bars["high"]) + bars["low"] + bars["close"]) / 3
+        volume = np.asarray(bars["volume"], dtype=np.float64)
+        start = 0
+        if sessions is not None and len(sessions):
+            start = int(np.flatnonzero(np.r_[True, sessions[1:] != sessions[:-1]])[-1])
+        self.pv = float(np.sum(typical[start:] * volume[start:]))
+        self.volume = float(np.sum(volume[start:]))
+        return {"vwap": out}
+
+    def update(self, bar):
+        session = bar.get("session")
+        if session is not None and session != self.session:
+            self.session = session
+            self.pv = self.volume = 0.0
+        self.pv += (bar["high"] + bar["low"] + bar["close"]) / 3 * bar["volume"]
+        self.volume += bar["volume"]
+        return {"vwap": self.pv / self.volume if self.volume > 0 else np.nan}
+
+
+INDICATORS = {
+    "sma": SMA,
+    "ema": EMA,
+    "rsi": RSI,
+    "macd": MACD,
+    "bollinger": Bollinger,
+    "atr": ATR,
+    "vwap": VWAP,
+}
+
+
+def frame_columns(frame, sessions=False):
+    # Plain float arrays for the kernels, plus a session id for VWAP resets
+    if isinstance(frame, BarSeries):
+        columns = frame.columns()
+        if sessions:
+            columns["session"] = frame.local_ns() // NS_PER_DAY
+        return columns
+    columns = {name.lower(): frame[name].to_numpy(dtype=np.float64) for name in ("Open", "High", "Low", "Close", "Volume")}
+    columns["ts"] = frame.index.as_unit("ns").asi8
+    if sessions:
+        columns["session"] = frame.index.normalize().as_unit("ns").asi8
+    return columns
+
+
+def _bar_at(frame, i):
+    # (timestamp in ns UTC, close) of bar i, read without converting any columns
+    if isinstance(frame, BarSeries):
+        return int(frame.ts[i]), float(frame.close[i])
+    return frame.index[i].value, float(frame["Close"].iat[i])
+
+
+def _tail(frame, start):
+    return frame[start:] if isinstance(frame, BarSeries) else frame.iloc[start:]
+
+
+class _Series:
+    # Output buffer with amortised O(1) append
+    def __init__(self, values):
+        self.size = len(values)
+        self.buffer = np.empty(max(16, self.size * 2))
+        self.buffer[:self.size] = values
+
+    def append(self, value):
+        if self.size == len(self.buffer):
+            grown = np.empty(len(self.buffer) * 2)
+            grown[:self.size] = self.buffer[:self.size]
+            self.buffer = grown
+        self.buffer[self.size] = value
+        self.size += 1
+
+    def view(self):
+        return self.buffer[:self.size]
+
+
+class _Entry:
+    def __init__(self, indicator, outputs, length, last_bar):
+        self.indicator = indicator
+        self.outputs = {name: _Series(values) for name, values in outputs.items()}
+        self.length = length
+        self.last_bar = last_bar
+
+
+class IndicatorEngine:
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, symbol, interval, name, frame, **params):
+        with span("indicators." + name):
+            return self._get(symbol, interval, name, frame, params)
+
+    def _get(self, symbol, interval, name, frame, params):
+        # The key and the bar boundaries are read straight off the frame; columns are only
+        # converted for a full compute, or for just the new bars when extending
+        n = len(frame)
+        sessions = name == "vwap"
+        key = (symbol, interval, _bar_at(frame, 0)[0] if n else None, name, tuple(sorted(params.items())))
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                entry = self._extend(entry, frame, sessions)
+            if entry is None:
+                indicator = INDICATORS[name](**params)
+                outputs = indicator.compute(frame_columns(frame, sessions))
+                entry = _Entry(indicator, outputs, n, _bar_at(frame, -1) if n else None)
+            self.entries[key] = entry
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            return {output: series.view() for output, series in entry.outputs.items()}
+
+    def _extend(self, entry, frame, sessions):
+        n = len(frame)
+        if n < entry.length or entry.length == 0:
+            return None
+        if _bar_at(frame, entry.length - 1) != entry.last_bar:
+            # History was revised underneath us, start over
+            return None
+        if n == entry.length:
+            return entry
+
+        # Convert and stream only the bars that arrived since the last call
+        columns = frame_columns(_tail(frame, entry.length), sessions)
+        for i in range(n - entry.length):
+            bar = {name: values[i] for name, values in columns.items()}
+            for output, value in entry.indicator.update(bar).items():
+                entry.outputs[output].append(value)
+        entry.length = n
+        entry.last_bar = _bar_at(frame, -1)
+        return entry
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
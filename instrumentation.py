@@ -0,0 +1,175 @@
+"""Timing spans with rolling latency percentiles, and a sampling profiler.
+
+    with span("fetch.history"):
+        ...
+
+Spans are off by default: span() then hands back one shared no-op context
+manager, so instrumented code pays a call and an empty with-block. Once
+enabled, each span name keeps its last WINDOW durations in a ring buffer and
+reports count, mean, p50/p95/p99 and max. Snapshots can be written to a JSON
+file, served over HTTP or shown in the GUI overlay.
+
+profile() samples every thread's stack from a background thread for a few
+seconds and writes the counts as folded stacks ("a;b;c 42"), the input format
+of flamegraph.pl and speedscope.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from pathlib import Path
+
+# Durations kept per span name for the percentiles
+WINDOW = 1024
+
+PROFILE_DIR = Path(os.environ.get("STOCK_ADVISOR_HOME", Path.home() / ".stock_advisor")) / "profiles"
+
+NOOP = nullcontext()
+
+enabled = os.environ.get("STOCK_ADVISOR_METRICS", "") not in ("", "0")
+
+
+def percentile(ordered, q):
+    # Nearest-rank percentile of an already sorted list
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+
+class Histogram:
+    __slots__ = ("durations", "count", "total", "peak")
+
+    def __init__(self, size=WINDOW):
+        self.durations = [0.0] * size
+        self.count = 0
+        self.total = 0.0
+        self.peak = 0.0
+
+    def record(self, seconds):
+        self.durations[self.count % len(self.durations)] = seconds
+        self.count += 1
+        self.total += seconds
+        self.peak = max(self.peak, seconds)
+
+    def summary(self):
+        recent = sorted(self.durations[:min(self.count, len(self.durations))])
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1e3 if self.count else 0.0,
+            "p50_ms": percentile(recent, 50) * 1e3,
+            "p95_ms": percentile(recent, 95) * 1e3,
+            "p99_ms": percentile(recent, 99) * 1e3,
+            "max_ms": self.peak * 1e3,
+        }
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+
+    def record(self, name, seconds):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.record(seconds)
+
+    def snapshot(self):
+        with self.lock:
+            return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+
+
+registry = Registry()
+
+
+class Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        registry.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def span(name):
+    return Span(name) if enabled else NOOP
+
+
+def enable(on=True):
+    global enabled
+    enabled = on
+
+
+def snapshot():
+    return {"enabled": enabled, "spans": registry.snapshot()}
+
+
+def write(path):
+    # Swap in atomically so readers never see a half-written file
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(snapshot(), indent=2))
+    os.replace(tmp, path)
+
+
+def summary_lines(limit=8):
+    # Slowest spans by p95, for the on-screen overlay
+    spans = sorted(registry.snapshot().items(), key=lambda item: item[1]["p95_ms"], reverse=True)
+    return [
+        f"{name:<22} {s['p50_ms']:7.1f} {s['p95_ms']:7.1f} {s['p99_ms']:7.1f}  n={s['count']}"
+        for name, s in spans[:limit]
+    ]
+
+
+def _folded(frame):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+def sample(duration=10.0, interval=0.005):
+    # Stack counts per thread; the sampling thread leaves itself out
+    me = threading.get_ident()
+    names = {}
+    counts = Counter()
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        if len(names) != threading.active_count():
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident != me:
+                counts[f"{names.get(ident, ident)};{_folded(frame)}"] += 1
+        time.sleep(interval)
+    return counts
+
+
+def profile(path, duration=10.0, interval=0.005, on_done=None):
+    # Sample in the background and write folded stacks to `path`
+    def run():
+        counts = sample(duration, interval)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text("".join(f"{stack} {count}\n" for stack, count in counts.most_common()))
+        if on_done is not None:
+            on_done(path)
+
+    thread = threading.Thread(target=run, name="profiler", daemon=True)
+    thread.start()
+    return thread
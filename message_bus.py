@@ -0,0 +1,112 @@
+"""Bounded, coalescing, prioritised message bus for the Tk thread.
+
+Producers on any thread put (msg_type, data) tuples, the same shape the app
+used with queue.Queue. Each message type can register a priority and a
+coalescing rule: "replace" keeps only the latest payload, "drop" keeps the
+one already queued, or a merge function combines the two. A coalescing key
+function can split one type into independent slots (e.g. per fetch key). The
+consumer drains in priority order under a per-frame time budget.
+"""
+import threading
+import time
+from collections import deque, namedtuple
+
+USER = 0
+NORMAL = 1
+BACKGROUND = 2
+
+Policy = namedtuple("Policy", ["priority", "coalesce", "key"])
+
+DEFAULT_POLICY = Policy(NORMAL, None, None)
+
+
+class MessageBus:
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.policies = {}
+        self.lanes = {USER: deque(), NORMAL: deque(), BACKGROUND: deque()}
+        # coalescing slot -> [msg_type, data]; lanes hold slots, so updates happen in place
+        self.slots = {}
+        self.counter = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def register(self, msg_type, priority=NORMAL, coalesce=None, key=None):
+        self.policies[msg_type] = Policy(priority, coalesce, key)
+
+    def put(self, message, priority=None):
+        msg_type, data = message
+        policy = self.policies.get(msg_type, DEFAULT_POLICY)
+        priority = policy.priority if priority is None else priority
+
+        with self.lock:
+            if policy.coalesce is not None:
+                slot = (msg_type, policy.key(data) if policy.key else None)
+                entry = self.slots.get(slot)
+                if entry is not None:
+                    self.coalesced += 1
+                    if policy.coalesce == "replace":
+                        entry[1] = data
+                    elif callable(policy.coalesce):
+                        entry[1] = policy.coalesce(entry[1], data)
+                    return True
+            else:
+                self.counter += 1
+                slot = (msg_type, self.counter)
+
+            if len(self.slots) >= self.capacity and not self._evict(priority):
+                self.dropped += 1
+                return False
+            self.slots[slot] = [msg_type, data]
+            self.lanes[priority].append(slot)
+            return True
+
+    def _evict(self, priority):
+        # Make room by dropping the oldest message of the least important non-empty lane,
+        # as long as it is no more important than the incoming one
+        for lane in (BACKGROUND, NORMAL, USER):
+            if lane < priority:
+                return False
+            if self.lanes[lane]:
+                del self.slots[self.lanes[lane].popleft()]
+                self.dropped += 1
+                return True
+        return False
+
+    def pop(self):
+        with self.lock:
+            for lane in (USER, NORMAL, BACKGROUND):
+                if self.lanes[lane]:
+                    entry = self.slots.pop(self.lanes[lane].popleft())
+                    return entry[0], entry[1]
+        return None
+
+    def dispatch(self, handler, budget=0.010):
+        # Handle messages until the time budget is spent; the rest wait for the next frame
+        deadline = time.perf_counter() + budget
+        handled = 0
+        while True:
+            message = self.pop()
+            if message is None:
+                break
+            handler(*message)
+            handled += 1
+            if time.perf_counter() >= deadline:
+                break
+        return handled
+
+    def empty(self):
+        return len(self) == 0
+
+    def __len__(self):
+        with self.lock:
+            return len(self.slots)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "pending": len(self.slots),
+                "coalesced": self.coalesced,
+                "dropped": self.dropped,
+            }
@@ -0,0 +1,200 @@
+"""Background news ingestion with a dedup index.
+
+Headlines are pulled per symbol on a worker pool, through the same data source
+(and gateway) as prices. Every story is normalised and hashed on its link, or
+on its title when there is no link. A bounded hash index means a story
+syndicated to many tickers, or seen again on the next poll, is only announced
+once. Each symbol keeps a bounded, time-ordered buffer of its own stories.
+Stories never seen before wait in an outbox, and a ("news", None) message
+tells the GUI to take() them, so a message dropped by a full bus loses
+nothing. Scheduled polls go through poll(), which requests one symbol at a
+time and, before each, gives way while user requests are queued or the
+gateway's request budget is low.
+"""
+import bisect
+import hashlib
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Leave at least this share of the gateway's request budget for the user
+MIN_HEADROOM = 0.5
+# How long a scheduled poll waits before checking for room again
+DEFER_SECONDS = 0.5
+
+NewsItem = namedtuple("NewsItem", ["digest", "symbol", "title", "publisher", "url", "published"])
+
+
+def _timestamp(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def parse_item(raw, symbol):
+    # yfinance has served both a flat layout and one nested under "content"
+    content = raw.get("content") or raw
+    title = (content.get("title") or "").strip()
+    if not title:
+        return None
+    provider = content.get("provider") or {}
+    url = (
+        (content.get("canonicalUrl") or {}).get("url")
+        or (content.get("clickThroughUrl") or {}).get("url")
+        or content.get("link")
+        or ""
+    )
+    published = _timestamp(content.get("pubDate") or content.get("providerPublishTime") or 0)
+    identity = url or " ".join(title.lower().split())
+    digest = hashlib.blake2b(identity.encode(), digest_size=8).hexdigest()
+    return NewsItem(digest, symbol, title, provider.get("displayName") or content.get("publisher") or "",
+                    url, published)
+
+
+class NewsBuffer:
+    # Stories for one symbol, oldest first, capped at `capacity`
+    __slots__ = ("capacity", "times", "items")
+
+    def __init__(self, capacity=50):
+        self.capacity = capacity
+        self.times = []
+        self.items = []
+
+    def add(self, item):
+        i = bisect.bisect(self.times, item.published)
+        self.times.insert(i, item.published)
+        self.items.insert(i, item)
+        if len(self.items) > self.capacity:
+            del self.times[0]
+            del self.items[0]
+
+    def latest(self, count=10):
+        return self.items[::-1][:count]
+
+
+class NewsService:
+    def __init__(self, message_queue, source, busy=None, per_symbol=50, index_size=20_000, max_workers=4):
+        self.message_queue = message_queue
+        self.source = source
+        # Callable returning True while user-initiated requests are waiting
+        self.busy = busy or (lambda: False)
+        self.per_symbol = per_symbol
+        self.index_size = index_size
+        self.lock = threading.Lock()
+        # digest -> symbols the story has been filed under, least recently seen first
+        self.index = OrderedDict()
+        self.buffers = {}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="news")
+        # Scheduled polls run here, one symbol at a time, so the pool stays free for user refreshes
+        self.poller = ThreadPoolExecutor(max_workers=1, thread_name_prefix="news-poll")
+        self.closed = threading.Event()
+        self.polling = False
+        self.pending = set()
+        # digest -> story not yet taken by the GUI, oldest first
+        self.outbox = OrderedDict()
+        self.deferred = 0
+
+    def poll(self, symbols):
+        # A poll still working through its symbols covers this one
+        with self.lock:
+            if self.polling:
+                return
+            self.polling = True
+        self.poller.submit(self._poll, list(dict.fromkeys(symbols)))
+
+    def _poll(self, symbols):
+        try:
+            for symbol in symbols:
+                while not self._room():
+                    self.deferred += 1
+                    if self.closed.wait(DEFER_SECONDS):
+                        return
+                if self._claim(symbol):
+                    self._refresh_one(symbol)
+        finally:
+            with self.lock:
+                self.polling = False
+
+    def _room(self):
+        headroom = getattr(self.source, "headroom", None)
+        return not self.busy() and (headroom is None or headroom() >= MIN_HEADROOM)
+
+    def _claim(self, symbol):
+        # False when a request for the symbol is already on its way
+        with self.lock:
+            if symbol in self.pending:
+                return False
+            self.pending.add(symbol)
+            return True
+
+    def refresh(self, symbols):
+        for symbol in dict.fromkeys(symbols):
+            if self._claim(symbol):
+                self.executor.submit(self._refresh_one, symbol)
+
+    def _refresh_one(self, symbol):
+        try:
+            raw = self.source.news(symbol)
+        except Exception as e:
+            logger.debug("News for %s failed: %s", symbol, e)
+            raw = []
+        finally:
+            with self.lock:
+                self.pending.discard(symbol)
+        self.ingest(symbol, raw)
+        # Also sent when only older stories are waiting, in case the last message never arrived
+        if self.outbox:
+            self.message_queue.put(("news", None))
+
+    def ingest(self, symbol, raw_items):
+        # Returns the stories nobody has seen before, newest first
+        fresh = []
+        with self.lock:
+            buffer = self.buffers.get(symbol)
+            if buffer is None:
+                buffer = self.buffers[symbol] = NewsBuffer(self.per_symbol)
+            for raw in raw_items or []:
+                item = parse_item(raw, symbol)
+                if item is None:
+                    continue
+                filed = self.index.get(item.digest)
+                if filed is None:
+                    filed = self.index[item.digest] = set()
+                    fresh.append(item)
+                    self.outbox[item.digest] = item
+                else:
+                    self.index.move_to_end(item.digest)
+                if symbol not in filed:
+                    filed.add(symbol)
+                    buffer.add(item)
+            while len(self.index) > self.index_size:
+                self.index.popitem(last=False)
+            while len(self.outbox) > self.index_size:
+                self.outbox.popitem(last=False)
+        fresh.sort(key=lambda item: item.published, reverse=True)
+        return fresh
+
+    def take(self):
+        # Stories not yet shown, newest first; they count as shown once taken
+        with self.lock:
+            items = list(self.outbox.values())
+            self.outbox.clear()
+        items.sort(key=lambda item: item.published, reverse=True)
+        return items
+
+    def latest(self, symbol, count=10):
+        with self.lock:
+            buffer = self.buffers.get(symbol)
+            return buffer.latest(count) if buffer is not None else []
+
+    def shutdown(self):
+        self.closed.set()
+        self.poller.shutdown(wait=False, cancel_futures=True)
+        self.executor.shutdown(wait=False, cancel_futures=True)
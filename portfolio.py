@@ -0,0 +1,250 @@
+"""Persisted positions and watchlist with vectorized mark-to-market.
+
+Trades and watchlist changes are appended to a SQLite ledger and never
+updated in place; positions and the watchlist are rebuilt by replaying it on
+startup. Open positions are held column-wise in NumPy arrays, one row per
+symbol, so revaluing the whole book against a batch of quotes (unrealized
+PnL, day change, exposure) is a handful of array operations however many
+positions there are. Each mark also reports which rows changed, so the
+portfolio window only rewrites those.
+"""
+import os
+import sqlite3
+import threading
+import time
+import tkinter as tk
+from tkinter import ttk
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_PATH = Path(os.environ.get("STOCK_ADVISOR_HOME", Path.home() / ".stock_advisor")) / "portfolio.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    symbol TEXT NOT NULL,
+    quantity REAL NOT NULL,
+    price REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS watchlist (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    symbol TEXT NOT NULL,
+    watched INTEGER NOT NULL
+);
+"""
+
+Trade = namedtuple("Trade", ["ts", "symbol", "quantity", "price"])
+
+Valuation = namedtuple("Valuation", [
+    "symbols", "quantity", "cost", "price", "value", "unrealized", "day_change", "weight", "changed", "totals",
+])
+
+
+class PortfolioStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.db.executescript(SCHEMA)
+
+    def record_trade(self, symbol, quantity, price):
+        trade = Trade(time.time(), symbol, float(quantity), float(price))
+        with self.lock, self.db:
+            self.db.execute("INSERT INTO trades (ts, symbol, quantity, price) VALUES (?, ?, ?, ?)", trade)
+        return trade
+
+    def trades(self):
+        with self.lock:
+            rows = self.db.execute("SELECT ts, symbol, quantity, price FROM trades ORDER BY id").fetchall()
+        return [Trade(*row) for row in rows]
+
+    def set_watched(self, symbol, watched):
+        with self.lock, self.db:
+            self.db.execute("INSERT INTO watchlist (ts, symbol, watched) VALUES (?, ?, ?)",
+                            (time.time(), symbol, int(watched)))
+
+    def watchlist(self):
+        # The latest event per symbol wins; symbols stay in the order they were first added
+        with self.lock:
+            rows = self.db.execute("SELECT symbol, watched FROM watchlist ORDER BY id").fetchall()
+        state = {}
+        for symbol, watched in rows:
+            state[symbol] = watched
+        return [symbol for symbol, watched in state.items() if watched]
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+class Book:
+    # One row per symbol ever traded; a closed position keeps its row with zero quantity
+    def __init__(self, trades=(), capacity=64):
+        self.symbols = []
+        self.rows = {}
+        self.quantity = np.zeros(capacity)
+        self.cost = np.zeros(capacity)
+        self.realized = np.zeros(capacity)
+        self.price = np.full(capacity, np.nan)
+        self.previous_close = np.full(capacity, np.nan)
+        # What the last mark reported per row, to find the rows that changed
+        self.marked = np.full((capacity, 3), np.nan)
+        for trade in trades:
+            self.apply(trade)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def row(self, symbol):
+        row = self.rows.get(symbol)
+        if row is None:
+            row = self.rows[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            if row == len(self.quantity):
+                self._grow()
+        return row
+
+    def _grow(self):
+        size = len(self.quantity) * 2
+        for name, fill in (("quantity", 0.0), ("cost", 0.0), ("realized", 0.0), ("price", np.nan),
+                           ("previous_close", np.nan), ("marked", np.nan)):
+            old = getattr(self, name)
+            new = np.full((size,) + old.shape[1:], fill)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def apply(self, trade):
+        # Average-cost accounting: reducing a position releases cost pro rata and realizes the difference
+        row = self.row(trade.symbol)
+        held, quantity = self.quantity[row], trade.quantity
+        if held and np.sign(held) != np.sign(quantity):
+            closed = min(abs(quantity), abs(held)) * np.sign(quantity)
+            released = self.cost[row] * (-closed / held)
+            self.realized[row] += -closed * trade.price - released
+            self.cost[row] -= released
+            self.quantity[row] += closed
+            quantity -= closed
+        if quantity:
+            self.cost[row] += quantity * trade.price
+            self.quantity[row] += quantity
+        if self.quantity[row] == 0:
+            self.cost[row] = 0.0
+        return row
+
+    def open_symbols(self):
+        n = len(self.symbols)
+        return [self.symbols[i] for i in np.flatnonzero(self.quantity[:n])]
+
+    def update_quotes(self, quotes):
+        # Quotes for symbols not in the book are ignored
+        hits = [(self.rows[symbol], quote) for symbol, quote in quotes.items() if symbol in self.rows]
+        if hits:
+            rows = np.fromiter((row for row, _ in hits), dtype=np.intp, count=len(hits))
+            self.price[rows] = [quote.price for _, quote in hits]
+            self.previous_close[rows] = [quote.previous_close for _, quote in hits]
+
+    def mark(self, quotes=None):
+        if quotes:
+            self.update_quotes(quotes)
+        n = len(self.symbols)
+        quantity, cost = self.quantity[:n], self.cost[:n]
+        price, previous_close = self.price[:n], self.previous_close[:n]
+        value = quantity * price
+        unrealized = value - cost
+        day_change = quantity * (price - previous_close)
+        gross = np.nansum(np.abs(value))
+        weight = value / gross if gross else np.zeros(n)
+
+        # Rows whose quantity, price or previous close moved since the last mark
+        current = np.column_stack([quantity, price, previous_close])
+        previous = self.marked[:n]
+        same = (current == previous) | (np.isnan(current) & np.isnan(previous))
+        changed = np.flatnonzero(~same.all(axis=1))
+        previous[:] = current
+
+        totals = {
+            "value": float(np.nansum(value)),
+            "cost": float(cost.sum()),
+            "unrealized": float(np.nansum(unrealized)),
+            "realized": float(self.realized[:n].sum()),
+            "day_change": float(np.nansum(day_change)),
+            "gross": float(gross),
+        }
+        return Valuation(self.symbols[:n], quantity, cost, price, value, unrealized, day_change, weight,
+                         changed, totals)
+
+
+def _money(value):
+    return "N/A" if value != value else f"{value:,.2f}"
+
+
+class PortfolioView:
+    COLUMNS = [("quantity", "Qty", 80), ("average", "Avg Cost", 90), ("price", "Price", 90),
+               ("value", "Value", 110), ("day", "Day", 100), ("unrealized", "Unrealized", 110)]
+
+    def __init__(self, parent, on_select=None, on_close=None):
+        self.on_select = on_select
+        self.on_close = on_close
+        self.window = tk.Toplevel(parent)
+        self.window.title("Portfolio")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.totals = ttk.Label(self.window, text="", font=('Helvetica', 10, 'bold'))
+        self.totals.pack(fill=tk.X, padx=10, pady=5)
+
+        frame = ttk.Frame(self.window)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.tree = ttk.Treeview(frame, columns=[name for name, _, _ in self.COLUMNS], height=20)
+        self.tree.heading("#0", text="Symbol")
+        self.tree.column("#0", width=90)
+        for name, text, width in self.COLUMNS:
+            self.tree.heading(name, text=text)
+            self.tree.column(name, width=width, anchor=tk.E)
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.tag_configure("up", foreground="green")
+        self.tree.tag_configure("down", foreground="red")
+        self.tree.bind("<Double-Button-1>", self.select)
+
+    def render(self, valuation, rows=None):
+        # Only the given rows (default: those that changed) are rewritten; closed positions are hidden
+        rows = valuation.changed if rows is None else rows
+        for i in rows:
+            symbol = valuation.symbols[i]
+            if valuation.quantity[i] == 0:
+                if self.tree.exists(symbol):
+                    self.tree.delete(symbol)
+                continue
+            values = (
+                f"{valuation.quantity[i]:,.4g}",
+                _money(valuation.cost[i] / valuation.quantity[i]),
+                _money(valuation.price[i]),
+                _money(valuation.value[i]),
+                _money(valuation.day_change[i]),
+                _money(valuation.unrealized[i]),
+            )
+            tags = ("down",) if valuation.unrealized[i] < 0 else ("up",) if valuation.unrealized[i] > 0 else ()
+            if self.tree.exists(symbol):
+                self.tree.item(symbol, values=values, tags=tags)
+            else:
+                self.tree.insert("", tk.END, iid=symbol, text=symbol, values=values, tags=tags)
+        totals = valuation.totals
+        self.totals.config(text=f"Value {_money(totals['value'])}   Day {_money(totals['day_change'])}   "
+                                f"Unrealized {_money(totals['unrealized'])}   Realized {_money(totals['realized'])}")
+
+    def select(self, event=None):
+        symbol = self.tree.focus()
+        if symbol and self.on_select is not None:
+            self.on_select(symbol)
+
+    def close(self):
+        self.window.destroy()
+        if self.on_close is not None:
+            self.on_close()
@@ -0,0 +1,125 @@
+"""Idle-time cache warming for the symbols and periods the user is likely to pick next.
+
+Candidates, most likely first:
+1. the periods next to the one on screen, for the current symbol
+2. symbols recently typed into the custom entry
+3. the popular tickers in the selection list
+
+Each candidate is warmed the way a click would load it: fundamentals, quote
+and recommendation, plus the bars for the current period. Work runs on one
+low-priority thread, at most `budget` upstream fetches per cycle. It pauses
+as soon as user requests are queued or the gateway's rate budget runs low, so
+prefetching never delays a click.
+"""
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from advisor import RECOMMENDATION_PERIOD
+from fetcher import history_is_fresh, info_is_fresh
+
+logger = logging.getLogger(__name__)
+
+# Chart periods in button order; neighbours are the likeliest next click
+PERIODS = ["1d", "1wk", "1mo", "3mo", "1y", "5y"]
+
+# Leave at least this share of the gateway's request budget for the user
+MIN_HEADROOM = 0.5
+
+
+class Prefetcher:
+    def __init__(self, core, symbols, busy=None, budget=6, recent=10):
+        self.core = core
+        self.symbols = list(symbols)
+        # Callable returning True while user-initiated requests are waiting
+        self.busy = busy or (lambda: False)
+        self.budget = budget
+        self.lock = threading.Lock()
+        self.recent = deque(maxlen=recent)
+        self.symbol = None
+        self.period = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        self.running = False
+        self.warmed = 0
+        self.paused = 0
+        self.cycles = 0
+
+    def focus(self, symbol, period):
+        # Called from the Tk thread whenever the user's selection changes
+        with self.lock:
+            self.symbol = symbol
+            self.period = period
+
+    def note_custom(self, symbol):
+        with self.lock:
+            if symbol in self.recent:
+                self.recent.remove(symbol)
+            self.recent.appendleft(symbol)
+
+    def candidates(self):
+        with self.lock:
+            symbol, period, recent = self.symbol, self.period, list(self.recent)
+        if symbol is None:
+            return []
+        tasks = []
+        if period in PERIODS:
+            here = PERIODS.index(period)
+            for other in sorted(PERIODS, key=lambda p: abs(PERIODS.index(p) - here))[1:]:
+                tasks.append(("history", symbol, other))
+        for other in dict.fromkeys(recent + self.symbols):
+            if other != symbol:
+                tasks.append(("symbol", other, period))
+        return tasks
+
+    def warm(self):
+        # Scheduler callback: start a cycle unless one is still going
+        with self.lock:
+            if self.running:
+                return
+            self.running = True
+        self.executor.submit(self._cycle)
+
+    def _cycle(self):
+        try:
+            self.cycles += 1
+            spent = 0
+            for kind, symbol, period in self.candidates():
+                if spent >= self.budget:
+                    break
+                if self._should_pause():
+                    self.paused += 1
+                    break
+                spent += self._warm_one(kind, symbol, period)
+        finally:
+            with self.lock:
+                self.running = False
+
+    def _should_pause(self):
+        if self.busy():
+            return True
+        headroom = getattr(self.core.store.source, "headroom", None)
+        return headroom is not None and headroom() < MIN_HEADROOM
+
+    def _warm_one(self, kind, symbol, period):
+        # Returns how many cold loads this took, so fresh entries cost nothing
+        cache, fetched = self.core.cache, 0
+        try:
+            if kind == "symbol":
+                fetched += not info_is_fresh(symbol, cache)
+                fetched += not history_is_fresh(symbol, RECOMMENDATION_PERIOD, cache)
+                if fetched or self.core.last_recommendation(symbol) is None:
+                    self.core.recommend(symbol)
+            if period is not None and not history_is_fresh(symbol, period, cache):
+                self.core.history(symbol, period)
+                fetched += 1
+        except Exception as e:
+            logger.debug("Prefetch of %s %s failed: %s", symbol, period, e)
+        self.warmed += fetched
+        return fetched
+
+    def stats(self):
+        return {"cycles": self.cycles, "warmed": self.warmed, "paused": self.paused}
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
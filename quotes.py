@@ -0,0 +1,88 @@
+"""Batched quote refresh for the watchlist, popular stocks and index rows.
+
+Symbols are split into chunks that are each fetched with one bulk download,
+with chunks running in parallel. Anything the bulk call could not price is
+retried one symbol at a time on a bounded pool. Refresh calls that arrive
+while one is still queued are merged into it. Results land in the shared
+cache and are posted to the app as ("quotes", {symbol: Quote}).
+"""
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from bar_store import shared_store
+from cache import QUOTE_TTL, shared_cache
+from instrumentation import span
+
+Quote = namedtuple("Quote", ["symbol", "price", "previous_close", "change", "change_pct"])
+
+
+def make_quote(symbol, data):
+    price = data["currentPrice"]
+    prev_close = data["previousClose"]
+    change = price - prev_close
+    change_pct = (change / prev_close) * 100 if prev_close else 0.0
+    return Quote(symbol, price, prev_close, change, change_pct)
+
+
+class QuoteService:
+    def __init__(self, message_queue, source=None, cache=shared_cache, chunk_size=100, max_workers=8):
+        self.message_queue = message_queue
+        self.source = source or shared_store.source
+        self.cache = cache
+        self.chunk_size = chunk_size
+        self.bulk_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="quotes")
+        self.single_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="quote")
+        self.lock = threading.Lock()
+        self.pending = None
+
+    def refresh(self, symbols):
+        with self.lock:
+            if self.pending is not None:
+                self.pending.update(dict.fromkeys(symbols))
+                return
+            self.pending = dict.fromkeys(symbols)
+        self.bulk_pool.submit(self._refresh)
+
+    def _refresh(self):
+        with self.lock:
+            symbols = list(self.pending)
+            self.pending = None
+        with span("quotes.refresh"):
+            quotes = self.fetch(symbols)
+        if quotes:
+            self.message_queue.put(("quotes", quotes))
+
+    def fetch(self, symbols):
+        raw = {}
+        chunks = [symbols[i:i + self.chunk_size] for i in range(0, len(symbols), self.chunk_size)]
+        futures = [self.single_pool.submit(self._fetch_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            raw.update(future.result())
+
+        # Fall back to one request per symbol for whatever the bulk calls missed
+        missing = [s for s in symbols if s not in raw]
+        futures = {self.single_pool.submit(self.source.quote, s): s for s in missing}
+        for future in as_completed(futures):
+            try:
+                raw[futures[future]] = future.result()
+            except Exception:
+                pass
+
+        quotes = {}
+        for symbol, data in raw.items():
+            if data.get("currentPrice") is None or data.get("previousClose") is None:
+                continue
+            self.cache.put(("quote", symbol), data, QUOTE_TTL)
+            quotes[symbol] = make_quote(symbol, data)
+        return quotes
+
+    def _fetch_chunk(self, chunk):
+        try:
+            return self.source.quotes(chunk)
+        except Exception:
+            return {}
+
+    def shutdown(self):
+        self.bulk_pool.shutdown(wait=False, cancel_futures=True)
+        self.single_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,150 @@
+"""Deterministic rule-based recommendation engine.
+
+Every symbol is reduced to a fixed feature vector (valuation, profitability,
+leverage, trend, RSI, momentum). A whole universe is scored in one NumPy pass:
+each feature maps to [-1, 1], missing features drop out of the weighted mean,
+and the score is bucketed into Strong Buy ... Strong Sell. Results are
+memoized per symbol until its inputs change.
+"""
+import threading
+
+import numpy as np
+
+from indicators import rsi, sma
+
+RECOMMENDATIONS = ["Strong Buy", "Buy", "Hold", "Sell", "Strong Sell"]
+
+# Lower score bound for each recommendation, best first
+THRESHOLDS = [0.45, 0.15, -0.15, -0.45]
+
+FEATURES = ["pe", "peg", "margin", "debt", "trend", "rsi", "momentum"]
+
+WEIGHTS = np.array([0.15, 0.15, 0.15, 0.10, 0.20, 0.10, 0.15])
+
+# Plain-language description of what drove a feature up or down
+DRIVERS = {
+    "pe": ("attractive P/E of {:.1f}", "rich P/E of {:.1f}"),
+    "peg": ("reasonable growth-adjusted valuation (PEG {:.2f})", "expensive growth (PEG {:.2f})"),
+    "margin": ("strong profit margins ({:.1%})", "thin profit margins ({:.1%})"),
+    "debt": ("low leverage (D/E {:.0f})", "heavy leverage (D/E {:.0f})"),
+    "trend": ("price {:.1%} above its 50-day average", "price {:.1%} below its 50-day average"),
+    "rsi": ("oversold RSI of {:.0f}", "overbought RSI of {:.0f}"),
+    "momentum": ("{:+.1%} three-month momentum", "{:+.1%} three-month momentum"),
+}
+
+
+def _number(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return np.nan
+    return value if np.isfinite(value) else np.nan
+
+
+def fundamental_features(info):
+    return {
+        "pe": _number(info.get('trailingPE')),
+        "peg": _number(info.get('pegRatio', info.get('trailingPegRatio'))),
+        "margin": _number(info.get('profitMargins')),
+        "debt": _number(info.get('debtToEquity')),
+    }
+
+
+def technical_features(close):
+    close = np.asarray(close, dtype=np.float64)
+    close = close[~np.isnan(close)]
+    features = {"trend": np.nan, "rsi": np.nan, "momentum": np.nan}
+    if len(close) >= 50:
+        features["trend"] = float(close[-1] / sma(close[-50:], 50)[-1] - 1)
+    if len(close) > 15:
+        features["rsi"] = float(rsi(close[-250:], 14)[-1])
+    if len(close) > 63:
+        features["momentum"] = float(close[-1] / close[-64] - 1)
+    return features
+
+
+def features_for(info, close=None):
+    features = fundamental_features(info)
+    features.update(technical_features(close if close is not None else []))
+    return features
+
+
+def score_matrix(matrix):
+    # matrix: (symbols, FEATURES) raw values -> per-feature scores in [-1, 1], NaN when missing
+    pe, peg, margin, debt, trend, rsi_value, momentum = matrix.T
+    with np.errstate(invalid="ignore"):
+        scores = np.column_stack([
+            np.where(pe <= 0, -1.0, np.clip((25 - pe) / 15, -1, 1)),
+            np.where(peg <= 0, -0.5, np.clip((1.5 - peg) / 1.0, -1, 1)),
+            np.clip((margin - 0.05) / 0.15, -1, 1),
+            np.clip((100 - debt) / 100, -1, 1),
+            np.clip(trend / 0.05, -1, 1),
+            np.clip((50 - rsi_value) / 20, -1, 1),
+            np.clip(momentum / 0.15, -1, 1),
+        ])
+    scores[np.isnan(matrix)] = np.nan
+    return scores
+
+
+def evaluate_batch(matrix):
+    scores = score_matrix(matrix)
+    present = ~np.isnan(scores)
+    weights = np.where(present, WEIGHTS, 0.0)
+    total = weights.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        combined = np.where(total > 0, np.nansum(scores * weights, axis=1) / total, 0.0)
+    # Bucket index 0 (Strong Buy) .. 4 (Strong Sell)
+    buckets = np.searchsorted(-np.array(THRESHOLDS), -combined, side="right")
+    return combined, buckets, scores * weights
+
+
+def describe(features, contributions):
+    # Reason text from the two strongest drivers in the direction of the score
+    order = np.argsort(-np.abs(np.nan_to_num(contributions)))
+    parts = []
+    for i in order[:2]:
+        if np.isnan(contributions[i]) or contributions[i] == 0:
+            continue
+        name = FEATURES[i]
+        template = DRIVERS[name][0 if contributions[i] > 0 else 1]
+        value = abs(features[name]) if name == "trend" else features[name]
+        parts.append(template.format(value))
+    if not parts:
+        return "Not enough data for a confident call"
+    text = " and ".join(parts)
+    return text[0].upper() + text[1:]
+
+
+class RecommendationEngine:
+    def __init__(self):
+        self.lock = threading.Lock()
+        # symbol -> (feature tuple, result)
+        self.memo = {}
+
+    def evaluate(self, features_by_symbol):
+        results = {}
+        pending = []
+        with self.lock:
+            for symbol, features in features_by_symbol.items():
+                key = tuple(features[name] for name in FEATURES)
+                entry = self.memo.get(symbol)
+                if entry is not None and np.array_equal(entry[0], key, equal_nan=True):
+                    results[symbol] = entry[1]
+                else:
+                    pending.append((symbol, features, key))
+
+        if pending:
+            matrix = np.array([key for _, _, key in pending], dtype=np.float64).reshape(len(pending), len(FEATURES))
+            combined, buckets, contributions = evaluate_batch(matrix)
+            with self.lock:
+                for row, (symbol, features, key) in enumerate(pending):
+                    result = {
+                        "symbol": symbol,
+                        "recommendation": RECOMMENDATIONS[buckets[row]],
+                        "score": float(combined[row]),
+                        "reason": describe(features, contributions[row]),
+                        "signals": {name: features[name] for name in FEATURES},
+                    }
+                    self.memo[symbol] = (key, result)
+                    results[symbol] = result
+        return results
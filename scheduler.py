@@ -0,0 +1,127 @@
+"""Timer-heap scheduler for periodic background jobs.
+
+Each job has its own interval. Market-hours jobs sleep until the next session
+open while the exchange is closed, and jobs with a `closed_interval` slow down
+to it. Failures back off exponentially, and every
+delay gets a little jitter so jobs don't all fire on the same tick. The worker
+thread sleeps until the next deadline instead of polling.
+"""
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+
+import market_calendar
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    def __init__(self, name, interval, callback, market_hours=False, jitter=0.1, max_backoff=15 * 60,
+                 closed_interval=None):
+        self.name = name
+        self.interval = interval
+        self.closed_interval = closed_interval
+        self.callback = callback
+        self.market_hours = market_hours
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.failures = 0
+
+    def next_delay(self, now=None):
+        delay = self.interval
+        if self.closed_interval is not None and not market_calendar.is_open(now):
+            delay = self.closed_interval
+        if self.failures:
+            delay = min(self.interval * 2 ** self.failures, max(self.max_backoff, self.interval))
+        delay *= 1 + random.uniform(-self.jitter, self.jitter)
+
+        if self.market_hours and not market_calendar.is_open(now):
+            # Nothing to poll for until the next session opens
+            wait = (market_calendar.next_open(now) - (now or market_calendar.now())).total_seconds()
+            delay = max(delay, wait + random.uniform(0, self.jitter * self.interval))
+        return delay
+
+
+class Scheduler:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.heap = []
+        self.jobs = {}
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+
+    def add(self, name, interval, callback, market_hours=False, run_now=False, **options):
+        job = Job(name, interval, callback, market_hours, **options)
+        with self.condition:
+            self.jobs[name] = job
+            delay = 0 if run_now and (not market_hours or market_calendar.is_open()) else job.next_delay()
+            self._push(job, delay)
+        return job
+
+    def remove(self, name):
+        with self.condition:
+            self.jobs.pop(name, None)
+
+    def trigger(self, name):
+        # Run a job as soon as possible, e.g. when the user asks for fresh data
+        with self.condition:
+            job = self.jobs.get(name)
+            if job is not None:
+                self._push(job, 0)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=2):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+
+    def _push(self, job, delay):
+        heapq.heappush(self.heap, (self.clock() + delay, next(self.counter), job))
+        self.condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                job = None
+                while self.running:
+                    if self.heap:
+                        due, _, candidate = self.heap[0]
+                        if self.jobs.get(candidate.name) is not candidate:
+                            heapq.heappop(self.heap)
+                            continue
+                        wait = due - self.clock()
+                        if wait <= 0:
+                            heapq.heappop(self.heap)
+                            job = candidate
+                            break
+                        self.condition.wait(wait)
+                    else:
+                        self.condition.wait()
+                if not self.running:
+                    return
+                # Drop other queued runs of this job; the one below reschedules it
+                self.heap = [entry for entry in self.heap if entry[2] is not job]
+                heapq.heapify(self.heap)
+
+            try:
+                job.callback()
+                job.failures = 0
+            except Exception:
+                job.failures += 1
+                logger.exception("Scheduled job %r failed (%d in a row)", job.name, job.failures)
+
+            with self.condition:
+                if self.jobs.get(job.name) is job:
+                    self._push(job, job.next_delay(datetime.now(market_calendar.MARKET_TZ)))
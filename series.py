@@ -0,0 +1,188 @@
+"""Compact array-backed OHLCV container.
+
+BarSeries keeps timestamps and volume as int64 and prices as float32 in
+contiguous arrays (28 bytes per bar versus several times that for a pandas
+frame with a DatetimeIndex). Period windows are zero-copy views over the same
+arrays, and new bars are appended in place with amortised O(1) growth.
+"""
+import numpy as np
+import pandas as pd
+
+from data_source import PERIOD_OFFSETS
+
+NS_PER_DAY = 86_400 * 1_000_000_000
+FIELDS = ("ts", "open", "high", "low", "close", "volume")
+
+
+class BarSeries:
+    __slots__ = ("_ts", "_open", "_high", "_low", "_close", "_volume", "_start", "_stop", "tz", "_owner")
+
+    def __init__(self, ts, open, high, low, close, volume, tz="UTC", capacity=None):
+        size = len(ts)
+        capacity = max(capacity or size, size)
+        self._ts = np.empty(capacity, dtype=np.int64)
+        self._open = np.empty(capacity, dtype=np.float32)
+        self._high = np.empty(capacity, dtype=np.float32)
+        self._low = np.empty(capacity, dtype=np.float32)
+        self._close = np.empty(capacity, dtype=np.float32)
+        self._volume = np.empty(capacity, dtype=np.int64)
+        for name, values in zip(FIELDS, (ts, open, high, low, close, volume)):
+            getattr(self, "_" + name)[:size] = values
+        self._start = 0
+        self._stop = size
+        self.tz = str(tz)
+        # Views point at the series that owns the buffers; owners point at themselves
+        self._owner = self
+
+    @classmethod
+    def from_frame(cls, frame, capacity=None):
+        index = frame.index
+        tz = index.tz or "UTC"
+        if index.tz is None:
+            index = index.tz_localize("UTC")
+        return cls(
+            index.tz_convert("UTC").as_unit("ns").asi8,
+            frame["Open"].to_numpy(),
+            frame["High"].to_numpy(),
+            frame["Low"].to_numpy(),
+            frame["Close"].to_numpy(),
+            np.nan_to_num(frame["Volume"].to_numpy(dtype=np.float64)).astype(np.int64),
+            tz,
+            capacity,
+        )
+
+    def _view(self, start, stop):
+        view = object.__new__(BarSeries)
+        for name in FIELDS:
+            setattr(view, "_" + name, getattr(self, "_" + name))
+        view._start = start
+        view._stop = stop
+        view.tz = self.tz
+        view._owner = self._owner
+        return view
+
+    # Column views (no copies)
+    @property
+    def ts(self):
+        return self._ts[self._start:self._stop]
+
+    @property
+    def open(self):
+        return self._open[self._start:self._stop]
+
+    @property
+    def high(self):
+        return self._high[self._start:self._stop]
+
+    @property
+    def low(self):
+        return self._low[self._start:self._stop]
+
+    @property
+    def close(self):
+        return self._close[self._start:self._stop]
+
+    @property
+    def volume(self):
+        return self._volume[self._start:self._stop]
+
+    def __len__(self):
+        return self._stop - self._start
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, "_" + name).nbytes for name in FIELDS)
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice) or item.step not in (None, 1):
+            raise TypeError("BarSeries only supports contiguous slices")
+        start, stop, _ = item.indices(len(self))
+        return self._view(self._start + start, self._start + max(start, stop))
+
+    def since(self, ts):
+        # Bars at or after `ts` (ns since the epoch, UTC)
+        return self[int(np.searchsorted(self.ts, ts, side="left")):]
+
+    def window(self, period):
+        if self.empty or period not in PERIOD_OFFSETS:
+            return self
+        if period in ("1d", "5d"):
+            # Intraday windows count trading sessions, not calendar days
+            days = self.local_ns() // NS_PER_DAY
+            starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+            return self[int(starts[-min(int(period[:-1]), len(starts))]):]
+        last = pd.Timestamp(int(self.ts[-1]), tz="UTC").tz_convert(self.tz)
+        return self.since((last - PERIOD_OFFSETS[period]).value)
+
+    def append(self, ts, open, high, low, close, volume):
+        # Grows the owning buffers in place; views keep seeing the bars they were cut from
+        if self._owner is not self:
+            raise ValueError("Append to the owning series, not a view")
+        if self._stop == len(self._ts):
+            capacity = max(16, len(self._ts) * 2)
+            for name in FIELDS:
+                old = getattr(self, "_" + name)
+                grown = np.empty(capacity, dtype=old.dtype)
+                grown[:self._stop] = old[:self._stop]
+                setattr(self, "_" + name, grown)
+        i = self._stop
+        self._ts[i], self._open[i], self._high[i] = ts, open, high
+        self._low[i], self._close[i], self._volume[i] = low, close, volume
+        self._stop += 1
+
+    def update_last(self, price, volume=None):
+        # Fold a live tick into the current bar
+        i = self._stop - 1
+        self._close[i] = price
+        self._high[i] = max(self._high[i], price)
+        self._low[i] = min(self._low[i], price)
+        if volume is not None:
+            self._volume[i] = volume
+
+    def fold_tick(self, bar_ts, price):
+        # A new owning series with a live tick folded into the bar starting at `bar_ts` (ns, UTC): the
+        # last bar is updated, or a later one appended. This one is left as it was, since other threads
+        # may be reading it. None for a tick older than the last bar
+        if self.empty or bar_ts < self.ts[-1]:
+            return None
+        folded = BarSeries(*(getattr(self, name) for name in FIELDS), tz=self.tz, capacity=len(self) + 1)
+        if bar_ts > self.ts[-1]:
+            folded.append(bar_ts, price, price, price, price, 0)
+        else:
+            folded.update_last(price)
+        return folded
+
+    def local_ns(self):
+        # Timestamps shifted to the exchange's wall clock
+        return self.index.tz_localize(None).as_unit("ns").asi8 if self.tz != "UTC" else self.ts
+
+    def date_numbers(self):
+        # Matplotlib date numbers in the exchange's wall-clock time
+        return self.local_ns() / NS_PER_DAY
+
+    @property
+    def index(self):
+        return pd.DatetimeIndex(self.ts.view("datetime64[ns]")).tz_localize("UTC").tz_convert(self.tz)
+
+    def columns(self):
+        # float64 copies for the indicator kernels
+        return {
+            "ts": self.ts,
+            "open": self.open.astype(np.float64),
+            "high": self.high.astype(np.float64),
+            "low": self.low.astype(np.float64),
+            "close": self.close.astype(np.float64),
+            "volume": self.volume.astype(np.float64),
+        }
+
+    def to_frame(self):
+        frame = pd.DataFrame({
+            "Open": self.open, "High": self.high, "Low": self.low,
+            "Close": self.close, "Volume": self.volume,
+        }, index=self.index)
+        frame.index.name = "Date"
+        return frame
@@ -0,0 +1,243 @@
+"""Headless HTTP/JSON API over the advisor core.
+
+A small asyncio HTTP/1.1 server with keep-alive; blocking data calls run on a
+bounded thread pool so one slow upstream request never stalls other clients.
+
+    GET  /quote?symbol=AAPL
+    GET  /history?symbol=AAPL&period=1mo
+    GET  /indicators?symbol=AAPL&period=1mo&names=sma,rsi,macd
+    GET  /recommendation?symbol=AAPL
+    GET  /screen?symbols=AAPL,MSFT,NVDA
+    POST /chat            {"symbol": "AAPL", "message": "price?"}
+    GET  /health
+    GET  /metrics
+"""
+import asyncio
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+import instrumentation
+from advisor import INDICATOR_DEFAULTS, AdvisorCore
+from bar_store import PERIOD_RANK
+from chat import ChatEngine
+from fetcher import history_params
+from instrumentation import span
+from symbols import MARKET_INDICES, POPULAR_STOCKS
+
+MAX_BODY = 64 * 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def clean(value):
+    # JSON has no NaN, and NumPy scalars/arrays need converting
+    if isinstance(value, dict):
+        return {str(k): clean(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [clean(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return [None if v != v else v for v in value.tolist()]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def frame_payload(data):
+    return {
+        "timestamps": [ts.isoformat() for ts in data.index],
+        **{column.lower(): data[column].to_numpy() for column in data.columns},
+    }
+
+
+class AdvisorServer:
+    def __init__(self, core=None, host="127.0.0.1", port=8765, workers=16):
+        self.core = core or AdvisorCore()
+        self.chat_engine = ChatEngine(self.core, POPULAR_STOCKS + MARKET_INDICES)
+        self.host = host
+        self.port = port
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")
+        self.routes = {
+            ("GET", "/quote"): self.quote,
+            ("GET", "/history"): self.history,
+            ("GET", "/indicators"): self.indicators,
+            ("GET", "/recommendation"): self.recommendation,
+            ("GET", "/screen"): self.screen,
+            ("POST", "/chat"): self.chat,
+            ("GET", "/chat"): self.chat,
+            ("GET", "/health"): self.health,
+            ("GET", "/metrics"): self.metrics,
+        }
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port, limit=MAX_BODY)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self.respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed request line"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self.respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length"}, False)
+                    break
+                if length > MAX_BODY:
+                    await self.respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                status, payload = await self.dispatch(method, target, body)
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if body:
+            try:
+                params.update(json.loads(body))
+            except (ValueError, TypeError):
+                return HTTPStatus.BAD_REQUEST, {"error": "Body must be a JSON object"}
+
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            return HTTPStatus.NOT_FOUND, {"error": f"No route for {method} {url.path}"}
+        try:
+            loop = asyncio.get_running_loop()
+            with span("http." + url.path.strip("/")):
+                return HTTPStatus.OK, await loop.run_in_executor(self.executor, handler, params)
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except Exception as e:
+            return HTTPStatus.BAD_GATEWAY, {"error": f"Failed to fetch data: {e}"}
+
+    async def respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(clean(payload)).encode()
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    def symbol(self, params):
+        symbol = str(params.get("symbol", "")).strip().upper()
+        if not symbol:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Missing 'symbol' parameter")
+        return symbol
+
+    def period(self, params):
+        period = str(params.get("period", "1mo")).strip()
+        if history_params(period)[0] not in PERIOD_RANK:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Unknown period: {period}")
+        return period
+
+    def quote(self, params):
+        return self.core.quote(self.symbol(params))
+
+    def history(self, params):
+        symbol = self.symbol(params)
+        period = self.period(params)
+        return {"symbol": symbol, "period": period, **frame_payload(self.core.history(symbol, period).to_frame())}
+
+    def indicators(self, params):
+        symbol = self.symbol(params)
+        period = self.period(params)
+        names = [n.strip() for n in str(params.get("names", "sma,rsi")).split(",") if n.strip()]
+        unknown = [n for n in names if n not in INDICATOR_DEFAULTS]
+        if unknown:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Unknown indicators: {', '.join(unknown)}")
+        data = self.core.history(symbol, period)
+        return {
+            "symbol": symbol,
+            "period": period,
+            "timestamps": [ts.isoformat() for ts in data.index],
+            "indicators": self.core.indicators(symbol, period, names, data),
+        }
+
+    def recommendation(self, params):
+        return self.core.recommend(self.symbol(params))
+
+    def screen(self, params):
+        symbols = [s.strip().upper() for s in str(params.get("symbols", "")).split(",") if s.strip()]
+        if not symbols:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Missing 'symbols' parameter")
+        results = self.core.recommend_many(list(dict.fromkeys(symbols)))
+        return {"results": sorted(results.values(), key=lambda r: r["score"], reverse=True)}
+
+    def chat(self, params):
+        message = str(params.get("message", "")).strip()
+        if not message:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Missing 'message' parameter")
+        # Report the symbol the answer is about, which the message may name itself
+        symbol = str(params.get("symbol", "AAPL")).strip().upper()
+        symbol = self.chat_engine.extract_symbol(message) or symbol
+        return {"symbol": symbol, "response": self.chat_engine.answer(message, symbol)}
+
+    def health(self, params):
+        source = self.core.store.source
+        upstream = source.stats() if hasattr(source, "stats") else None
+        return {"status": "ok", "cache": self.core.cache.stats(), "upstream": upstream}
+
+    def metrics(self, params):
+        return instrumentation.snapshot()
+
+
+def run(host="127.0.0.1", port=8765, core=None):
+    server = AdvisorServer(core, host, port)
+    print(f"AI Stock Advisor API listening on http://{host}:{port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -1,13 +1,68 @@
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
-import yfinance as yf
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from tkinter import ttk, scrolledtext, messagebox, simpledialog
 from datetime import datetime, timedelta
-import random
+from collections import deque
+import argparse
+import bisect
+import importlib
+import json
 import threading
-import queue
 import time
+import webbrowser
+
+from chat import ChatTranscript
+from instrumentation import span
+from message_bus import BACKGROUND, NORMAL, USER, MessageBus
+from scheduler import Scheduler
+from symbols import MARKET_INDICES, POPULAR_STOCKS
+import instrumentation
+import market_calendar
+
+# pandas, matplotlib and the data layer take a couple of seconds to import, so the
+# window is shown first and these load on a background thread
+DEFERRED_MODULES = [
+    "matplotlib.figure",
+    "matplotlib.backends.backend_tkagg",
+    "advisor",
+    "chart",
+    "downsample",
+    "fetcher",
+    "news",
+    "portfolio",
+    "prefetch",
+    "quotes",
+    "streaming",
+]
+
+# The window should be up within this long of launch (see bench_startup.py)
+STARTUP_TARGET = 1.0
+
+# Live ticks are folded into the UI at most this often (~30 fps)
+FRAME_MS = 33
+
+# Time the Tk thread may spend on queued messages before yielding to input events
+MESSAGE_BUDGET = 0.010
+
+# How long a sampling profile runs when triggered with Shift+F12
+PROFILE_SECONDS = 10
+
+# How often idle time is used to warm the cache for likely next clicks
+PREFETCH_SECONDS = 10
+
+# News is polled this often (hourly while the market is closed); the footer keeps at most
+# NEWS_ROWS headlines
+NEWS_SECONDS = 120
+NEWS_CLOSED_SECONDS = 60 * 60
+NEWS_ROWS = 200
+
+# Chat messages kept for scrolling back, shown at once, and paged in when scrolling to the top
+CHAT_HISTORY = 1000
+CHAT_ROWS = 100
+CHAT_PAGE = 20
+
+# Panels in the dashboard grid (4x4)
+DASHBOARD_COLUMNS = 4
+DASHBOARD_PANELS = 16
 
 class StockAdvisorApp:
     def __init__(self, root):
@@ -24,6 +79,15 @@ class StockAdvisorApp:
         self.style.configure('Positive.TLabel', foreground='green')
         self.style.configure('Negative.TLabel', foreground='red')
         
+        # Live price labels keyed by symbol, filled by the batched quote service
+        self.quote_labels = {}
+        self.watchlist = []
+        
+        # Startup milestones (epoch seconds); the data layer is attached once its modules load
+        self.startup = {}
+        self.ready = False
+        self.root.bind("<Map>", lambda event: self.startup.setdefault("window", time.time()), add="+")
+        
         # Create main frames
         self.header_frame = ttk.Frame(root)
         self.header_frame.pack(fill=tk.X, padx=10, pady=5)
@@ -60,18 +124,123 @@ class StockAdvisorApp:
         # Footer - market status and news
         self.setup_footer()
         
-        # Initialize with default stock
+        # Message queue for chat bot and background results
+        self.message_queue = MessageBus(capacity=500)
+        self.message_queue.register("update_status", BACKGROUND, coalesce="replace")
+        self.message_queue.register("update_stock", BACKGROUND, coalesce="drop")
+        self.message_queue.register("update_chart", BACKGROUND, coalesce="drop")
+        self.message_queue.register("refresh_quotes", BACKGROUND, coalesce="drop")
+        self.message_queue.register("refresh_dashboard", BACKGROUND, coalesce="drop")
+        self.message_queue.register("refresh_news", BACKGROUND, coalesce="drop")
+        self.message_queue.register("chat_response", USER)
+        self.message_queue.register("news", BACKGROUND, coalesce="drop")
+        self.message_queue.register("quotes", BACKGROUND, coalesce=lambda old, new: {**old, **new})
+        self.message_queue.register("fetch_result", NORMAL, coalesce="replace", key=lambda result: result.key)
+        self.message_queue.register("modules_loaded", USER)
+        self.message_queue.register("profile_done", NORMAL)
+        self.root.after(100, self.process_messages)
+        
+        self.live_job = None
+        self.chart_data = None
+        self.dashboard = None
+        self.portfolio_view = None
+        self.last_error = None
         self.selected_stock = "AAPL"
-        self.update_stock_data()
         
-        # Message queue for chat bot
-        self.message_queue = queue.Queue()
-        self.root.after(100, self.process_messages)
+        # Performance overlay (F12) and sampling profiler (Shift+F12)
+        self.overlay = None
+        self.metrics_before_overlay = False
+        self.root.bind("<F12>", lambda event: self.toggle_overlay())
+        self.root.bind("<Shift-F12>", lambda event: self.start_profile())
+        
+        # Start background data updates; market-hours jobs sleep while the exchange is closed
+        self.scheduler = Scheduler()
+        self.scheduler.add("status", 30, self.post_market_status, run_now=True)
+        self.scheduler.add("quote", 60, lambda: self.poll("update_stock"), market_hours=True)
+        self.scheduler.add("bars", 60, lambda: self.poll("update_chart"), market_hours=True)
+        self.scheduler.add("indices", 60, lambda: self.poll("refresh_quotes"), market_hours=True)
+        self.scheduler.start()
+        
+        threading.Thread(target=self.load_modules, name="deferred-imports", daemon=True).start()
+    
+    def poll(self, message):
+        # Runs on the scheduler thread. The refresh is queued either way, but while upstream is failing
+        # the job raises, which the scheduler counts as a failure and backs off
+        self.message_queue.put((message, None))
+        source = self.core.store.source if self.ready else None
+        if hasattr(source, "check"):
+            source.check()
+    
+    def load_modules(self):
+        # Runs off the Tk thread; the main thread builds the chart and services once this is done
+        for name in DEFERRED_MODULES:
+            importlib.import_module(name)
+        self.message_queue.put(("modules_loaded", None))
+        # Warm up the network client too, so the first fetch doesn't pay for it
+        try:
+            importlib.import_module("yfinance")
+        except ImportError:
+            pass
+    
+    def start_services(self):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from concurrent.futures import ThreadPoolExecutor
+        from advisor import AdvisorCore
+        from chart import ChartRenderer
+        from chat import ChatEngine
+        from downsample import Decimator
+        from fetcher import FetchPipeline
+        from news import NewsService
+        from portfolio import Book, PortfolioStore
+        from prefetch import Prefetcher
+        from quotes import QuoteService
+        from streaming import LiveStream
+        
+        # Chart area
+        self.chart_placeholder.destroy()
+        self.figure = Figure(figsize=(8, 4), dpi=100)
+        
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self.chart_area)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
-        # Start background data updates
-        self.running = True
-        self.update_thread = threading.Thread(target=self.background_update, daemon=True)
-        self.update_thread.start()
+        # Artists are created once and updated in place on every redraw
+        self.chart = ChartRenderer(self.figure, self.canvas)
+        
+        # Network I/O runs on worker threads and reports back through the queue
+        self.core = AdvisorCore()
+        self.indicators = self.core.indicator_engine
+        self.fetcher = FetchPipeline(self.message_queue, handlers={
+            "recommendation": lambda key: self.core.recommend(key.symbol),
+        })
+        self.quotes = QuoteService(self.message_queue)
+        self.stream = LiveStream()
+        self.decimator = Decimator()
+        self.prefetcher = Prefetcher(self.core, POPULAR_STOCKS, busy=lambda: self.fetcher.pending() > 0)
+        self.scheduler.add("prefetch", PREFETCH_SECONDS, self.prefetcher.warm)
+        self.news = NewsService(self.message_queue, self.core.store.source, busy=lambda: self.fetcher.pending() > 0)
+        self.scheduler.add("news", NEWS_SECONDS, lambda: self.message_queue.put(("refresh_news", None)),
+                           run_now=True, closed_interval=NEWS_CLOSED_SECONDS)
+        # Positions and the watchlist are replayed from the on-disk ledger
+        self.portfolio = PortfolioStore()
+        self.book = Book(self.portfolio.trades())
+        self.watchlist = self.portfolio.watchlist()
+        # One worker answers chat messages in the order they were sent
+        self.chat = ChatEngine(self.core, POPULAR_STOCKS + MARKET_INDICES + self.watchlist, self.news)
+        self.chat_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat")
+        self.ready = True
+        self.startup["ready"] = time.time()
+        
+        # Paint whatever the last session left on disk, then refresh from the network
+        period = self.time_period.get()
+        data = self.core.cached_history(self.selected_stock, period)
+        if not data.empty:
+            self.chart_data = ((self.selected_stock, period), data)
+            self.render_chart(data)
+        self.update_stock_data()
+        self.refresh_quotes()
+        if self.live_mode.get():
+            self.toggle_live()
     
     def update_time(self):
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -84,17 +253,21 @@ class StockAdvisorApp:
         
         self.stock_var = tk.StringVar(value="AAPL")
         
-        popular_stocks = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "META", "NVDA", "JPM", "V", "WMT"]
-        
-        for stock in popular_stocks:
+        for stock in POPULAR_STOCKS:
+            row = ttk.Frame(frame)
+            row.pack(fill=tk.X)
+            
             rb = ttk.Radiobutton(
-                frame, 
+                row, 
                 text=stock, 
                 variable=self.stock_var, 
                 value=stock,
                 command=self.on_stock_select
             )
-            rb.pack(anchor=tk.W)
+            rb.pack(side=tk.LEFT)
+            
+            self.quote_labels[stock] = ttk.Label(row, text="")
+            self.quote_labels[stock].pack(side=tk.RIGHT)
         
         # Custom stock entry
         ttk.Label(frame, text="Or enter symbol:").pack(anchor=tk.W, pady=(10, 0))
@@ -108,6 +281,18 @@ class StockAdvisorApp:
             command=self.on_custom_stock
         )
         self.custom_stock_button.pack(fill=tk.X)
+        
+        ttk.Button(
+            frame, 
+            text="Dashboard", 
+            command=self.open_dashboard
+        ).pack(fill=tk.X, pady=(5, 0))
+        
+        ttk.Button(
+            frame, 
+            text="Portfolio", 
+            command=self.open_portfolio
+        ).pack(fill=tk.X, pady=(5, 0))
     
     def setup_stock_details(self):
         frame = ttk.LabelFrame(self.left_frame, text="Stock Details", padding=10)
@@ -196,12 +381,11 @@ class StockAdvisorApp:
             )
             rb.pack(side=tk.LEFT, padx=5)
         
-        # Chart area
-        self.figure = plt.Figure(figsize=(8, 4), dpi=100)
-        self.ax = self.figure.add_subplot(111)
-        
-        self.canvas = FigureCanvasTkAgg(self.figure, master=frame)
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # The figure goes here once matplotlib has loaded (see start_services)
+        self.chart_area = ttk.Frame(frame)
+        self.chart_area.pack(fill=tk.BOTH, expand=True)
+        self.chart_placeholder = ttk.Label(self.chart_area, text="Loading chart...")
+        self.chart_placeholder.pack(expand=True)
         
         # Indicators
         indicator_frame = ttk.Frame(frame)
@@ -212,7 +396,7 @@ class StockAdvisorApp:
             indicator_frame, 
             text="Moving Average (50)", 
             variable=self.show_ma,
-            command=self.update_chart
+            command=self.redraw_chart
         ).pack(side=tk.LEFT, padx=5)
         
         self.show_rsi = tk.BooleanVar(value=False)
@@ -220,8 +404,16 @@ class StockAdvisorApp:
             indicator_frame, 
             text="RSI", 
             variable=self.show_rsi,
-            command=self.update_chart
+            command=self.redraw_chart
         ).pack(side=tk.LEFT, padx=5)
+        
+        self.live_mode = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            indicator_frame, 
+            text="Live", 
+            variable=self.live_mode,
+            command=self.toggle_live
+        ).pack(side=tk.RIGHT, padx=5)
     
     def setup_chat_bot(self):
         frame = ttk.LabelFrame(self.right_frame, text="AI Stock Advisor Chat", padding=10)
@@ -234,6 +426,14 @@ class StockAdvisorApp:
             state=tk.DISABLED
         )
         self.chat_display.pack(fill=tk.BOTH, expand=True, pady=5)
+        self.chat_display.config(yscrollcommand=self.on_chat_scroll)
+        
+        # The widget shows a window of the transcript: line counts of the messages on
+        # screen, oldest first, and the sequence number of the first one
+        self.transcript = ChatTranscript(CHAT_HISTORY)
+        self.chat_lines = deque()
+        self.chat_first = 0
+        self.chat_paging = False
         
         input_frame = ttk.Frame(frame)
         input_frame.pack(fill=tk.X, pady=5)
@@ -260,14 +460,13 @@ class StockAdvisorApp:
         self.market_status = ttk.Label(status_frame, text="Market: Closed", style='Stock.TLabel')
         self.market_status.pack(anchor=tk.W)
         
-        indices = ["^GSPC", "^DJI", "^IXIC", "^RUT"]
-        
-        for index in indices:
+        for index in MARKET_INDICES:
             idx_frame = ttk.Frame(status_frame)
             idx_frame.pack(fill=tk.X, pady=2)
             
             ttk.Label(idx_frame, text=index).pack(side=tk.LEFT)
-            ttk.Label(idx_frame, text="", width=15).pack(side=tk.RIGHT)
+            self.quote_labels[index] = ttk.Label(idx_frame, text="", width=15)
+            self.quote_labels[index].pack(side=tk.RIGHT)
         
         # News headlines
         news_frame = ttk.LabelFrame(self.footer_frame, text="Latest News", padding=10)
@@ -280,17 +479,35 @@ class StockAdvisorApp:
             background="white"
         )
         self.news_list.pack(fill=tk.BOTH, expand=True)
+        self.news_list.bind("<Double-Button-1>", self.open_news)
         
-        # Add some sample news
-        sample_news = [
-            "Fed signals potential rate cuts in Q3",
-            "Tech stocks rally on AI optimism",
-            "Oil prices surge amid supply concerns",
-            "Retail sales exceed expectations"
-        ]
-        
-        for news in sample_news:
-            self.news_list.insert(tk.END, news)
+        # Publish times (negated, so the list stays newest first) and links, one per row
+        self.news_times = []
+        self.news_urls = []
+    
+    def refresh_news(self):
+        # The service gives way to user requests symbol by symbol
+        self.news.poll(MARKET_INDICES + [self.selected_stock] + POPULAR_STOCKS + self.watchlist)
+    
+    def render_news(self):
+        # Only stories not shown yet are taken; each goes straight to its row and the oldest rows are trimmed
+        for item in self.news.take():
+            row = bisect.bisect(self.news_times, -item.published)
+            if row >= NEWS_ROWS:
+                continue
+            when = datetime.fromtimestamp(item.published).strftime("%b %d %H:%M")
+            self.news_times.insert(row, -item.published)
+            self.news_urls.insert(row, item.url)
+            self.news_list.insert(row, f"{when}  {item.symbol}: {item.title}")
+        if len(self.news_times) > NEWS_ROWS:
+            self.news_list.delete(NEWS_ROWS, tk.END)
+            del self.news_times[NEWS_ROWS:]
+            del self.news_urls[NEWS_ROWS:]
+    
+    def open_news(self, event=None):
+        selection = self.news_list.curselection()
+        if selection and self.news_urls[selection[0]]:
+            webbrowser.open(self.news_urls[selection[0]])
     
     def on_stock_select(self):
         self.selected_stock = self.stock_var.get()
@@ -300,40 +517,193 @@ class StockAdvisorApp:
         custom_stock = self.custom_stock_entry.get().strip().upper()
         if custom_stock:
             self.selected_stock = custom_stock
+            if self.ready:
+                self.prefetcher.note_custom(custom_stock)
             self.update_stock_data()
         else:
             messagebox.showwarning("Input Error", "Please enter a stock symbol")
     
+    def select_symbol(self, symbol):
+        # Used by the dashboard: clicking a panel loads it in the main window
+        self.stock_var.set(symbol)
+        self.selected_stock = symbol
+        self.update_stock_data()
+    
+    def open_dashboard(self):
+        if not self.ready:
+            return
+        if self.dashboard is not None:
+            self.dashboard.window.lift()
+            return
+        from dashboard import Dashboard
+        
+        symbols = list(dict.fromkeys(POPULAR_STOCKS + MARKET_INDICES + self.watchlist))[:DASHBOARD_PANELS]
+        self.dashboard = Dashboard(self.root, self.core, self.message_queue, symbols,
+                                   period=self.time_period.get(), columns=DASHBOARD_COLUMNS,
+                                   on_select=self.select_symbol, on_close=self.on_dashboard_closed)
+        self.scheduler.add("dashboard", 60, lambda: self.message_queue.put(("refresh_dashboard", None)),
+                           market_hours=True)
+    
+    def on_dashboard_closed(self):
+        self.scheduler.remove("dashboard")
+        self.dashboard = None
+    
+    def open_portfolio(self):
+        if not self.ready:
+            return
+        if self.portfolio_view is not None:
+            self.portfolio_view.window.lift()
+            return
+        from portfolio import PortfolioView
+        
+        self.portfolio_view = PortfolioView(self.root, on_select=self.select_symbol, on_close=self.on_portfolio_closed)
+        valuation = self.book.mark()
+        self.portfolio_view.render(valuation, rows=range(len(valuation.symbols)))
+    
+    def on_portfolio_closed(self):
+        self.portfolio_view = None
+    
+    def mark_portfolio(self, quotes=None):
+        # One vectorized pass over the whole book; the window only rewrites rows that changed
+        with span("portfolio.mark"):
+            valuation = self.book.mark(quotes)
+        if self.portfolio_view is not None:
+            self.portfolio_view.render(valuation)
+    
     def update_stock_data(self):
+        if not self.ready:
+            # start_services picks up whatever is selected by then
+            return
+        # Drop requests for symbols the user has moved away from, then queue fresh ones
+        self.fetcher.cancel_stale(self.selected_stock)
+        self.fetcher.submit(self.selected_stock, "info")
+        self.fetcher.submit(self.selected_stock, "recommendation")
+        self.news.refresh([self.selected_stock])
+        self.update_chart()
+        if self.live_mode.get():
+            self.stream.start([self.selected_stock])
+    
+    def toggle_live(self):
+        if not self.ready:
+            return
+        if self.live_mode.get():
+            self.stream.start([self.selected_stock])
+            if self.live_job is None:
+                self.live_job = self.root.after(FRAME_MS, self.render_ticks)
+        else:
+            self.stream.stop()
+            if self.live_job is not None:
+                self.root.after_cancel(self.live_job)
+                self.live_job = None
+    
+    def render_ticks(self):
+        # Runs once per frame; any number of ticks since the last frame collapse into one update
         try:
-            stock = yf.Ticker(self.selected_stock)
-            info = stock.info
+            tick = self.stream.drain().get(self.selected_stock)
+            if tick is not None:
+                self.render_tick(tick)
+        finally:
+            self.live_job = self.root.after(FRAME_MS, self.render_ticks)
+    
+    def render_tick(self, tick):
+        import pandas as pd
+        from chart import date_numbers
+        from fetcher import fold_tick
+        
+        info = self.core.cached_info(tick.symbol) or {}
+        self.render_price(tick.price, info.get('previousClose', 'N/A'))
+        
+        # Fold the tick into the cached bars, then move the price line on the chart showing them
+        key = (tick.symbol, self.time_period.get())
+        if self.chart_data is None or self.chart_data[0] != key:
+            return
+        folded = fold_tick(tick.symbol, key[1], pd.Timestamp(tick.ts, unit='s', tz='UTC').value, tick.price,
+                           self.core.cache)
+        if folded is None:
+            return
+        self.chart_data = (key, folded)
+        self.chart.update_last(folded[-1:].date_numbers()[0], tick.price)
+    
+    def update_chart(self):
+        if not self.ready:
+            return
+        self.prefetcher.focus(self.selected_stock, self.time_period.get())
+        self.fetcher.submit(self.selected_stock, "history", self.time_period.get())
+    
+    def refresh_quotes(self):
+        if not self.ready:
+            return
+        self.quotes.refresh(POPULAR_STOCKS + MARKET_INDICES + self.watchlist + self.book.open_symbols())
+    
+    def render_quotes(self, quotes):
+        for symbol, quote in quotes.items():
+            label = self.quote_labels.get(symbol)
+            if label is None:
+                continue
+            style = 'Positive.TLabel' if quote.change >= 0 else 'Negative.TLabel'
+            label.config(text=f"{quote.price:,.2f} ({quote.change_pct:+.2f}%)", style=style)
+        self.mark_portfolio(quotes)
+    
+    def redraw_chart(self):
+        # Indicator toggles reuse the bars already on screen
+        if self.chart_data is not None and self.chart_data[0] == (self.selected_stock, self.time_period.get()):
+            self.render_chart(self.chart_data[1])
+        else:
+            self.update_chart()
+    
+    def on_fetch_result(self, result):
+        key = result.key
+        if key.symbol != self.selected_stock:
+            return
+        if key.kind == "history" and key.period != self.time_period.get():
+            return
+        
+        if result.error is not None:
+            # Stale data is served whenever there is any, so this only fires with nothing to show.
+            # Report each failure once rather than stacking dialogs on every refresh.
+            message = f"Failed to fetch data for {key.symbol}: {str(result.error)}"
+            if message != self.last_error:
+                self.last_error = message
+                self.add_chat_message("System", message)
+            return
+        self.last_error = None
+        if key.kind == "info":
+            self.render_stock_data(result.data)
+        elif key.kind == "recommendation":
+            self.render_recommendation(result.data)
+        elif key.kind == "history":
+            self.chart_data = ((key.symbol, key.period), result.data)
+            self.render_chart(result.data)
+    
+    def render_price(self, current_price, prev_close):
+        if current_price != 'N/A' and prev_close != 'N/A':
+            change = current_price - prev_close
+            change_pct = (change / prev_close) * 100
             
+            self.price_label.config(text=f"${current_price:.2f}")
+            
+            if change >= 0:
+                self.change_label.config(
+                    text=f"+${change:.2f} (+{change_pct:.2f}%)", 
+                    style='Positive.TLabel'
+                )
+            else:
+                self.change_label.config(
+                    text=f"-${abs(change):.2f} ({change_pct:.2f}%)", 
+                    style='Negative.TLabel'
+                )
+        else:
+            self.price_label.config(text="N/A")
+            self.change_label.config(text="N/A")
+    
+    def render_stock_data(self, info):
+        try:
             # Update basic info
             self.stock_name_label.config(text=f"{info.get('longName', 'N/A')} ({self.selected_stock})")
             
             current_price = info.get('currentPrice', info.get('regularMarketPrice', 'N/A'))
             prev_close = info.get('previousClose', 'N/A')
-            
-            if current_price != 'N/A' and prev_close != 'N/A':
-                change = current_price - prev_close
-                change_pct = (change / prev_close) * 100
-                
-                self.price_label.config(text=f"${current_price:.2f}")
-                
-                if change >= 0:
-                    self.change_label.config(
-                        text=f"+${change:.2f} (+{change_pct:.2f}%)", 
-                        style='Positive.TLabel'
-                    )
-                else:
-                    self.change_label.config(
-                        text=f"-${abs(change):.2f} ({change_pct:.2f}%)", 
-                        style='Negative.TLabel'
-                    )
-            else:
-                self.price_label.config(text="N/A")
-                self.change_label.config(text="N/A")
+            self.render_price(current_price, prev_close)
             
             # Market cap
             market_cap = info.get('marketCap', 'N/A')
@@ -355,52 +725,13 @@ class StockAdvisorApp:
             pe_ratio = info.get('trailingPE', 'N/A')
             self.pe_label.config(text=pe_ratio if pe_ratio != 'N/A' else "N/A")
             
-            # Generate AI recommendation
-            self.generate_recommendation(stock)
-            
-            # Update chart
-            self.update_chart()
-            
         except Exception as e:
             messagebox.showerror("Error", f"Failed to fetch data for {self.selected_stock}: {str(e)}")
     
-    def generate_recommendation(self, stock):
-        # Simulate AI analysis with some randomness
-        actions = ["Strong Buy", "Buy", "Hold", "Sell", "Strong Sell"]
-        weights = [0.2, 0.3, 0.3, 0.15, 0.05]  # Higher probability for positive recommendations
-        
-        recommendation = random.choices(actions, weights=weights)[0]
-        
-        # Generate reasoning
-        reasons = {
-            "Strong Buy": [
-                "Exceptional growth potential with strong fundamentals",
-                "Undervalued based on our AI analysis with positive momentum",
-                "Industry leader with expanding market share"
-            ],
-            "Buy": [
-                "Solid financials with reasonable valuation",
-                "Positive earnings outlook with manageable risks",
-                "Technical indicators show upward momentum"
-            ],
-            "Hold": [
-                "Fairly valued with balanced risk/reward",
-                "Waiting for clearer signals on future performance",
-                "Mixed technical and fundamental indicators"
-            ],
-            "Sell": [
-                "Valuation appears stretched relative to peers",
-                "Deteriorating fundamentals and negative momentum",
-                "Increased competitive pressures affecting margins"
-            ],
-            "Strong Sell": [
-                "Significant downside risk identified",
-                "Severe fundamental deterioration",
-                "Technical indicators show strong downward momentum"
-            ]
-        }
-        
-        reason = random.choice(reasons[recommendation])
+    def render_recommendation(self, result):
+        from advisor import METRICS
+        
+        recommendation = result["recommendation"]
         
         # Update UI
         self.recommendation_label.config(text=recommendation)
@@ -419,178 +750,299 @@ class StockAdvisorApp:
         
         analysis = f"""AI Analysis for {self.selected_stock}:
         
-Recommendation: {recommendation}
-Reason: {reason}
+Recommendation: {recommendation} (score {result["score"]:+.2f})
+Reason: {result["reason"]}
 
 Key Metrics:
-- P/E Ratio: {stock.info.get('trailingPE', 'N/A')}
-- PEG Ratio: {stock.info.get('pegRatio', 'N/A')}
-- Profit Margins: {stock.info.get('profitMargins', 'N/A')}
-- Debt/Equity: {stock.info.get('debtToEquity', 'N/A')}
 """
+        analysis += "".join(f"- {label}: {result['metrics'][key]}\n" for key, label in METRICS)
         
         self.recommendation_detail.insert(tk.END, analysis)
         self.recommendation_detail.config(state=tk.DISABLED)
     
-    def update_chart(self):
+    def render_chart(self, data):
+        with span("ui.render_chart"):
+            self._render_chart(data)
+    
+    def _render_chart(self, data):
+        from fetcher import history_params
+        
         try:
             period = self.time_period.get()
-            stock = yf.Ticker(self.selected_stock)
-            
-            # Determine interval based on period
-            if period == "1d":
-                interval = "5m"
-                data = stock.history(period=period, interval=interval)
-                # For intraday, we need to filter out pre/post market if desired
-                data = data.between_time('09:30', '16:00')
-            elif period in ["1wk", "5d"]:
-                interval = "60m"
-                data = stock.history(period="5d", interval=interval)
-            else:
-                interval = "1d"
-                data = stock.history(period=period, interval=interval)
-            
-            # Clear previous chart
-            self.ax.clear()
-            
-            # Plot closing prices
-            self.ax.plot(data.index, data['Close'], label='Price', color='blue')
+            interval = history_params(period)[1]
+            x = data.date_numbers()
+            close = data.close
             
             # Add moving average if selected
+            ma = ma_label = None
             if self.show_ma.get():
                 ma_window = 50 if len(data) > 50 else len(data) // 2
                 if ma_window > 1:
-                    ma = data['Close'].rolling(window=ma_window).mean()
-                    self.ax.plot(data.index, ma, label=f'MA {ma_window}', color='orange')
+                    ma = self.indicators.get(self.selected_stock, interval, "sma", data, period=ma_window)["sma"]
+                    ma_label = f'MA {ma_window}'
             
             # Add RSI if selected
+            rsi = None
             if self.show_rsi.get() and len(data) > 14:
-                delta = data['Close'].diff()
-                gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-                rs = gain / loss
-                rsi = 100 - (100 / (1 + rs))
-                
-                # Create a second y-axis for RSI
-                ax2 = self.ax.twinx()
-                ax2.plot(data.index, rsi, label='RSI', color='purple', alpha=0.5)
-                ax2.axhline(70, color='red', linestyle='--', alpha=0.3)
-                ax2.axhline(30, color='green', linestyle='--', alpha=0.3)
-                ax2.set_ylim(0, 100)
-                ax2.set_ylabel('RSI')
-                ax2.legend(loc='upper right')
+                rsi = self.indicators.get(self.selected_stock, interval, "rsi", data, period=14)["rsi"]
             
-            # Format chart
-            self.ax.set_title(f"{self.selected_stock} Price Chart ({period})")
-            self.ax.set_xlabel("Date")
-            self.ax.set_ylabel("Price ($)")
-            self.ax.grid(True, alpha=0.3)
-            self.ax.legend(loc='upper left')
+            # Only draw as many points as the plot has pixels to show
+            keep = self.decimator.indices((self.selected_stock, period), x, close, self.chart.plot_width())
+            if len(keep) < len(x):
+                x, close = x[keep], close[keep]
+                ma = ma[keep] if ma is not None else None
+                rsi = rsi[keep] if rsi is not None else None
             
-            # Rotate x-axis labels for better readability
-            plt.setp(self.ax.get_xticklabels(), rotation=45, ha='right')
-            
-            # Adjust layout
-            self.figure.tight_layout()
-            
-            # Redraw canvas
-            self.canvas.draw()
+            self.chart.render(f"{self.selected_stock} Price Chart ({period})", x, close, ma, ma_label, rsi)
+            self.startup.setdefault("chart", time.time())
             
         except Exception as e:
             messagebox.showerror("Chart Error", f"Failed to update chart: {str(e)}")
     
     def add_chat_message(self, sender, message):
+        entry = self.transcript.add(sender, message)
+        following = self.chat_display.yview()[1] >= 1.0
         self.chat_display.config(state=tk.NORMAL)
-        self.chat_display.insert(tk.END, f"{sender}: {message}\n\n")
+        self.chat_display.insert(tk.END, f"{entry.sender}: {entry.text}\n\n")
+        self.chat_lines.append(entry.text.count("\n") + 2)
+        # Drop the oldest rows so the widget never grows with the session; leave more
+        # while the user is reading back, so the view doesn't jump under them
+        limit = CHAT_ROWS if following else CHAT_ROWS * 3
+        while len(self.chat_lines) > limit:
+            self.chat_display.delete("1.0", f"{self.chat_lines.popleft() + 1}.0")
+            self.chat_first += 1
         self.chat_display.config(state=tk.DISABLED)
-        self.chat_display.see(tk.END)
+        if following:
+            self.chat_display.see(tk.END)
+    
+    def on_chat_scroll(self, first, last):
+        self.chat_display.vbar.set(first, last)
+        if float(first) <= 0.0 and float(last) < 1.0 and not self.chat_paging:
+            self.chat_paging = True
+            self.root.after_idle(self.page_chat)
+    
+    def page_chat(self):
+        # Scrolled to the top: bring back a page of older messages from the transcript
+        self.chat_paging = False
+        older = self.transcript.before(self.chat_first, CHAT_PAGE)
+        if not older:
+            return
+        self.chat_display.config(state=tk.NORMAL)
+        added = 0
+        for entry in reversed(older):
+            self.chat_display.insert("1.0", f"{entry.sender}: {entry.text}\n\n")
+            lines = entry.text.count("\n") + 2
+            self.chat_lines.appendleft(lines)
+            added += lines
+        self.chat_display.config(state=tk.DISABLED)
+        self.chat_first = older[0].seq
+        # Keep the message that was at the top where it was
+        self.chat_display.yview(f"{added + 1}.0")
     
     def send_chat_message(self, event=None):
         message = self.chat_input.get().strip()
         if message:
             self.add_chat_message("You", message)
             self.chat_input.delete(0, tk.END)
-            
-            # Simulate AI thinking
-            self.root.after(1000, lambda: self.generate_ai_response(message))
+            self.generate_ai_response(message)
     
     def generate_ai_response(self, user_message):
-        # Simple AI response logic
-        user_message = user_message.lower()
-        
-        if any(word in user_message for word in ["hello", "hi", "hey"]):
-            response = "Hello! How can I assist you with your stock research today?"
-        elif any(word in user_message for word in ["price", "current", "value"]):
-            response = f"The current price of {self.selected_stock} is {self.price_label.cget('text')}."
-        elif any(word in user_message for word in ["recommend", "suggest", "advice"]):
-            response = f"Our AI recommends: {self.recommendation_label.cget('text')}. " \
-                      "Would you like more details about this recommendation?"
-        elif any(word in user_message for word in ["chart", "graph", "technical"]):
-            response = "I can help you analyze the technical indicators. " \
-                      "Try enabling RSI or moving averages from the chart controls."
-        elif any(word in user_message for word in ["news", "update", "headline"]):
-            response = "Recent market news is displayed at the bottom of the screen. " \
-                      "Would you like me to summarize any specific news item?"
-        elif any(word in user_message for word in ["thank", "thanks"]):
-            response = "You're welcome! Let me know if you have any other questions."
-        else:
-            response = "I'm an AI stock advisor. I can help with stock analysis, " \
-                      "price information, recommendations, and technical analysis. " \
-                      "How can I assist you?"
-        
-        self.add_chat_message("AI Advisor", response)
+        if not self.ready:
+            self.add_chat_message("AI Advisor", "Still loading market data, please try again in a moment.")
+            return
+        # Answered on the chat worker from the cache and bar store; the reply comes back through the queue
+        symbol = self.selected_stock
+        self.chat_executor.submit(self._answer_chat, user_message, symbol)
+    
+    def _answer_chat(self, message, symbol):
+        try:
+            with span("chat.answer"):
+                response = self.chat.answer(message, symbol)
+        except Exception as e:
+            response = f"Sorry, I couldn't answer that: {e}"
+        self.message_queue.put(("chat_response", response))
     
     def trade_action(self, action):
+        if not self.ready:
+            return
+        from advisor import format_price
+        
         stock = self.selected_stock
-        price = self.price_label.cget("text")
         
-        if action == "buy":
-            message = f"Buy order placed for {stock} at {price}"
-            messagebox.showinfo("Order Confirmation", message)
-        elif action == "sell":
-            message = f"Sell order placed for {stock} at {price}"
+        if action in ("buy", "sell"):
+            # Filled at the last quote in the cache, not the label text
+            info = self.core.cached_info(stock)
+            price = self.core.quote(stock, info)["price"] if info else None
+            if price is None:
+                messagebox.showerror("Order", f"No price for {stock} yet, please try again in a moment.")
+                return
+            quantity = simpledialog.askfloat(
+                action.capitalize(), f"Shares of {stock} to {action} at {format_price(price)}:",
+                parent=self.root, minvalue=0
+            )
+            if not quantity:
+                return
+            trade = self.portfolio.record_trade(stock, quantity if action == "buy" else -quantity, price)
+            self.book.apply(trade)
+            self.mark_portfolio()
+            self.refresh_quotes()
+            message = f"{action.capitalize()} order placed for {quantity:g} {stock} at {format_price(price)}"
             messagebox.showinfo("Order Confirmation", message)
         elif action == "watchlist":
-            message = f"{stock} added to your watchlist"
+            watched = stock not in self.watchlist
+            if watched:
+                self.watchlist.append(stock)
+            else:
+                self.watchlist.remove(stock)
+            self.portfolio.set_watched(stock, watched)
+            self.refresh_quotes()
+            self.chat.set_symbols(POPULAR_STOCKS + MARKET_INDICES + self.watchlist)
+            message = f"{stock} {'added to' if watched else 'removed from'} your watchlist"
             messagebox.showinfo("Watchlist", message)
         
         self.add_chat_message("System", f"Action: {action} for {stock}")
     
-    def background_update(self):
-        while self.running:
-            try:
-                # Update market status
-                market_open = 9 <= datetime.now().hour < 16
-                status = "Market: Open" if market_open else "Market: Closed"
-                self.message_queue.put(("update_status", status))
-                
-                # Update stock data every 60 seconds
-                if datetime.now().second == 0:
-                    self.message_queue.put(("update_stock", None))
-                
-                time.sleep(1)
-            except:
-                pass
+    def post_market_status(self):
+        status = "Market: Open" if market_calendar.is_open() else "Market: Closed"
+        self.message_queue.put(("update_status", status))
+    
+    def toggle_overlay(self):
+        if self.overlay is not None:
+            self.overlay.destroy()
+            self.overlay = None
+            # Back to whatever --metrics (or the environment) had set
+            instrumentation.enable(self.metrics_before_overlay)
+            return
+        # Showing the overlay switches the spans on for as long as it is up
+        self.metrics_before_overlay = instrumentation.enabled
+        instrumentation.enable()
+        self.overlay = tk.Label(self.root, justify=tk.LEFT, anchor=tk.NW, font=('Courier', 9),
+                                background='#202020', foreground='#e0e0e0')
+        self.overlay.place(relx=1.0, y=40, anchor=tk.NE)
+        self.update_overlay()
+    
+    def update_overlay(self):
+        if self.overlay is None:
+            return
+        lines = [f"{'span':<22} {'p50':>7} {'p95':>7} {'p99':>7}  (ms)"] + instrumentation.summary_lines()
+        self.overlay.config(text="\n".join(lines))
+        self.root.after(1000, self.update_overlay)
+    
+    def start_profile(self):
+        path = instrumentation.PROFILE_DIR / f"profile-{datetime.now():%Y%m%d-%H%M%S}.folded"
+        self.add_chat_message("System", f"Profiling for {PROFILE_SECONDS}s...")
+        instrumentation.profile(path, PROFILE_SECONDS,
+                                on_done=lambda path: self.message_queue.put(("profile_done", path)))
     
     def process_messages(self):
         try:
-            while not self.message_queue.empty():
-                msg_type, data = self.message_queue.get_nowait()
-                
-                if msg_type == "update_status":
-                    self.market_status.config(text=data)
-                elif msg_type == "update_stock":
-                    self.update_stock_data()
-        
+            with span("ui.messages"):
+                self.message_queue.dispatch(self.handle_message, MESSAGE_BUDGET)
         finally:
-            self.root.after(100, self.process_messages)
+            # Come straight back if the budget ran out with work still queued
+            self.root.after(1 if len(self.message_queue) else 100, self.process_messages)
+    
+    def handle_message(self, msg_type, data):
+        if msg_type == "update_status":
+            self.market_status.config(text=data)
+        elif msg_type == "modules_loaded":
+            self.start_services()
+        elif msg_type == "profile_done":
+            self.add_chat_message("System", f"Profile written to {data}")
+        elif not self.ready:
+            # Timer ticks that arrive before the data layer exists have nothing to refresh
+            return
+        elif msg_type == "update_stock":
+            self.fetcher.submit(self.selected_stock, "info")
+            self.fetcher.submit(self.selected_stock, "recommendation")
+        elif msg_type == "update_chart":
+            self.update_chart()
+        elif msg_type == "refresh_quotes":
+            self.refresh_quotes()
+        elif msg_type == "fetch_result":
+            self.on_fetch_result(data)
+        elif msg_type == "quotes":
+            self.render_quotes(data)
+        elif msg_type == "dashboard_panel":
+            if self.dashboard is not None:
+                self.dashboard.apply(data)
+        elif msg_type == "refresh_dashboard":
+            if self.dashboard is not None:
+                self.dashboard.refresh()
+        elif msg_type == "chat_response":
+            self.add_chat_message("AI Advisor", data)
+        elif msg_type == "refresh_news":
+            self.refresh_news()
+        elif msg_type == "news":
+            self.render_news()
     
     def on_closing(self):
-        self.running = False
+        self.scheduler.stop()
+        if self.dashboard is not None:
+            self.dashboard.close()
+        if self.ready:
+            self.stream.stop()
+            self.fetcher.shutdown()
+            self.quotes.shutdown()
+            self.prefetcher.shutdown()
+            self.news.shutdown()
+            self.chat_executor.shutdown(wait=False, cancel_futures=True)
+            self.portfolio.close()
         self.root.destroy()
+    
+    def report_startup(self, launched, timeout=30):
+        # Print startup milestones relative to `launched` once the first chart is up, then quit
+        def check():
+            if "chart" in self.startup or time.time() - launched > timeout:
+                print(json.dumps({name: round(stamp - launched, 4) for name, stamp in self.startup.items()}), flush=True)
+                self.on_closing()
+            else:
+                self.root.after(10, check)
+        self.root.after(10, check)
 
-if __name__ == "__main__":
+def main():
+    parser = argparse.ArgumentParser(description="AI Real-Time Stock Advisor")
+    parser.add_argument("--headless", action="store_true", help="serve the advisor over HTTP instead of opening the GUI")
+    parser.add_argument("--host", default="127.0.0.1", help="address for the headless API (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="port for the headless API (default: 8765)")
+    parser.add_argument("--stub", action="store_true", help="serve deterministic offline data instead of Yahoo")
+    parser.add_argument("--flaky", type=float, default=0.0, metavar="RATE",
+                        help="with --stub, fail this fraction of upstream calls and add latency")
+    parser.add_argument("--metrics", action="store_true", help="record timing spans (F12 shows them in the GUI; /metrics serves them headless)")
+    parser.add_argument("--metrics-file", metavar="PATH", help="also write a span snapshot to PATH every 10 seconds")
+    parser.add_argument("--startup-report", type=float, metavar="LAUNCHED", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.metrics or args.metrics_file:
+        instrumentation.enable()
+    if args.metrics_file:
+        metrics_writer = Scheduler()
+        metrics_writer.add("metrics", 10, lambda: instrumentation.write(args.metrics_file))
+        metrics_writer.start()
+    
+    if args.headless:
+        import server
+        from advisor import AdvisorCore
+        core = None
+        if args.stub:
+            import tempfile
+            from bar_store import BarStore
+            from cache import DataCache
+            from data_source import FlakySource, StubSource
+            from gateway import Gateway
+            source = StubSource()
+            if args.flaky:
+                source = FlakySource(source, error_rate=args.flaky)
+            core = AdvisorCore(cache=DataCache(), store=BarStore(tempfile.mkdtemp(), Gateway(source)))
+        server.run(args.host, args.port, core)
+        return
+    
     root = tk.Tk()
     app = StockAdvisorApp(root)
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
-    root.mainloop()
\ No newline at end of file
+    if args.startup_report is not None:
+        app.report_startup(args.startup_report)
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
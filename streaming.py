@@ -0,0 +1,168 @@
+"""Live tick streaming with per-symbol ring buffers.
+
+A TickSource pushes ticks from a background thread: YahooStreamSource keeps one
+websocket open to Yahoo's quote streamer, and ReplaySource plays back recorded
+or synthetic bars for tests and offline demos. Ticks are written into
+fixed-size ring buffers and only the latest one per symbol is marked dirty.
+The GUI collects the dirty ticks once per frame, so a burst of ticks costs one
+redraw instead of one queue message each.
+"""
+import logging
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+Tick = namedtuple("Tick", ["symbol", "ts", "price", "volume"])
+
+
+class TickRing:
+    # Fixed-capacity ring of (ts, price, volume); the oldest ticks are overwritten
+    __slots__ = ("ts", "price", "volume", "capacity", "count", "head")
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.ts = np.zeros(capacity, dtype=np.float64)
+        self.price = np.zeros(capacity, dtype=np.float64)
+        self.volume = np.zeros(capacity, dtype=np.float64)
+        self.count = 0
+        self.head = 0
+
+    def append(self, ts, price, volume):
+        self.ts[self.head] = ts
+        self.price[self.head] = price
+        self.volume[self.head] = volume
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def last(self):
+        if not self.count:
+            return None
+        i = (self.head - 1) % self.capacity
+        return self.ts[i], self.price[i], self.volume[i]
+
+    def arrays(self):
+        # Oldest-first copies of the buffered ticks
+        order = (np.arange(self.count) + self.head - self.count) % self.capacity
+        return self.ts[order], self.price[order], self.volume[order]
+
+
+class YahooStreamSource:
+    def __init__(self):
+        self.ws = None
+
+    def run(self, symbols, on_tick, stop):
+        import yfinance as yf
+        while not stop.is_set():
+            try:
+                self.ws = yf.WebSocket(verbose=False)
+                self.ws.subscribe(list(symbols))
+                self.ws.listen(lambda message: self._handle(message, on_tick))
+            except Exception as e:
+                if stop.is_set():
+                    break
+                logger.warning("Quote stream dropped (%s); reconnecting", e)
+            # Back off briefly before reconnecting
+            stop.wait(5)
+
+    def _handle(self, message, on_tick):
+        price = message.get("price")
+        if message.get("id") and price is not None:
+            ts = float(message.get("time", time.time() * 1000)) / 1000
+            on_tick(Tick(message["id"], ts, float(price), float(message.get("day_volume", 0) or 0)))
+
+    def stop(self):
+        if self.ws is not None:
+            try:
+                self.ws.close()
+            except Exception:
+                pass
+
+
+class ReplaySource:
+    """Replays bar closes as ticks, optionally faster than real time."""
+
+    def __init__(self, frames, speed=60.0, loop=False):
+        # frames: {symbol: DataFrame with a Close column}
+        self.frames = frames
+        self.speed = speed
+        self.loop = loop
+
+    def run(self, symbols, on_tick, stop):
+        events = []
+        for symbol in symbols:
+            frame = self.frames.get(symbol)
+            if frame is None or frame.empty:
+                continue
+            ts = frame.index.as_unit("ns").asi8 / 1e9
+            volume = frame["Volume"].to_numpy(dtype=np.float64) if "Volume" in frame else np.zeros(len(frame))
+            events.extend(zip(ts, [symbol] * len(frame), frame["Close"].to_numpy(dtype=np.float64), volume))
+        events.sort()
+        if not events:
+            return
+
+        while not stop.is_set():
+            start_wall, start_ts = time.monotonic(), events[0][0]
+            for ts, symbol, price, volume in events:
+                delay = (ts - start_ts) / self.speed - (time.monotonic() - start_wall)
+                if delay > 0 and stop.wait(delay):
+                    return
+                on_tick(Tick(symbol, float(ts), float(price), float(volume)))
+            if not self.loop:
+                return
+
+    def stop(self):
+        pass
+
+
+class LiveStream:
+    def __init__(self, source=None, capacity=4096):
+        self.source = source or YahooStreamSource()
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.rings = {}
+        self.dirty = {}
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.symbols = ()
+
+    def start(self, symbols):
+        symbols = tuple(dict.fromkeys(symbols))
+        if self.thread is not None and self.thread.is_alive() and symbols == self.symbols:
+            return
+        self.stop()
+        self.symbols = symbols
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.source.run, args=(symbols, self.on_tick, self.stop_event),
+                                       name="tick-stream", daemon=True)
+        self.thread.start()
+
+    def stop(self, wait=False):
+        # The old thread exits on its own; late ticks for other symbols are harmless
+        self.stop_event.set()
+        self.source.stop()
+        if wait and self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2)
+        self.thread = None
+
+    def on_tick(self, tick):
+        with self.lock:
+            ring = self.rings.get(tick.symbol)
+            if ring is None:
+                ring = self.rings[tick.symbol] = TickRing(self.capacity)
+            ring.append(tick.ts, tick.price, tick.volume)
+            self.dirty[tick.symbol] = tick
+
+    def drain(self):
+        # Latest tick per symbol since the last call; everything in between is coalesced
+        with self.lock:
+            dirty, self.dirty = self.dirty, {}
+        return dirty
+
+    def ticks(self, symbol):
+        with self.lock:
+            ring = self.rings.get(symbol)
+            return ring.arrays() if ring is not None else None
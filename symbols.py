@@ -0,0 +1,4 @@
+"""Symbols the GUI, the API and chat know about without asking upstream."""
+
+POPULAR_STOCKS = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "META", "NVDA", "JPM", "V", "WMT"]
+MARKET_INDICES = ["^GSPC", "^DJI", "^IXIC", "^RUT"]
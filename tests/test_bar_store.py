@@ -0,0 +1,67 @@
+"""BarStore against the offline stub source: full download once, then only the missing tail."""
+import pandas as pd
+
+from bar_store import BarStore
+from data_source import StubSource
+
+
+def history_calls(source):
+    return [call for call in source.calls if call[0] == "history"]
+
+
+def test_first_request_downloads_the_period(tmp_path):
+    source = StubSource(end="2024-06-28 16:00")
+    store = BarStore(tmp_path, source)
+
+    frame = store.history("AAPL", "1mo", "1d")
+
+    assert history_calls(source) == [("history", "AAPL", "1d", "1mo", None)]
+    assert not frame.empty
+    assert frame.index[-1].normalize() == pd.Timestamp("2024-06-28", tz="America/New_York")
+
+
+def test_later_request_fetches_only_the_tail(tmp_path):
+    source = StubSource(end="2024-06-28 16:00")
+    store = BarStore(tmp_path, source)
+    first = store.history("AAPL", "1mo", "1d")
+
+    # A week later: only bars from the last stored one onwards are asked for
+    later = StubSource(end="2024-07-05 16:00")
+    store.source = later
+    second = store.history("AAPL", "1mo", "1d")
+
+    (call,) = history_calls(later)
+    assert call[3] is None
+    assert call[4] == first.index[-1]
+    assert second.index[-1] > first.index[-1]
+    assert second.index.is_unique and second.index.is_monotonic_increasing
+    # Bars that were already stored are kept, not re-downloaded
+    overlap = first.index[first.index >= second.index[0]]
+    pd.testing.assert_frame_equal(first.loc[overlap], second.loc[overlap], check_freq=False)
+
+
+def test_store_persists_across_instances(tmp_path):
+    BarStore(tmp_path, StubSource(end="2024-06-28 16:00")).history("MSFT", "3mo", "1d")
+
+    source = StubSource(end="2024-06-28 16:00")
+    reopened = BarStore(tmp_path, source)
+    cached = reopened.cached("MSFT", "3mo", "1d")
+    frame = reopened.history("MSFT", "1mo", "1d")
+
+    assert not cached.empty
+    # Covered by the stored three months: just the tail refresh, never a full download
+    (call,) = history_calls(source)
+    assert call[3] is None and call[4] == cached.index[-1]
+    assert frame.index[-1] == cached.index[-1]
+
+
+def test_longer_period_triggers_a_full_download(tmp_path):
+    store = BarStore(tmp_path, StubSource(end="2024-06-28 16:00"))
+    store.history("AAPL", "1mo", "1d")
+
+    source = StubSource(end="2024-06-28 16:00")
+    store.source = source
+    frame = store.history("AAPL", "1y", "1d")
+
+    assert history_calls(source) == [("history", "AAPL", "1d", "1y", None)]
+    assert frame.index[0] < pd.Timestamp("2023-08-01", tz="America/New_York")
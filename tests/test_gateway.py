@@ -0,0 +1,139 @@
+"""Gateway behaviour and the stale-data fallbacks, offline against the stub and flaky sources."""
+import threading
+
+import pytest
+
+from bar_store import BarStore
+from cache import DataCache
+from data_source import FlakySource, StubSource
+from fetcher import fetch_history, fetch_info
+from gateway import Gateway, UpstreamUnavailable
+
+
+class Failing:
+    # Fails the first `failures` calls, then answers from the stub
+    def __init__(self, failures, error=ConnectionError):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+        self.source = StubSource()
+
+    def info(self, symbol):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error("boom")
+        return self.source.info(symbol)
+
+
+def test_concurrent_identical_calls_share_one_request():
+    source = FlakySource(latency=0.2, jitter=0, error_rate=0)
+    gateway = Gateway(source, rate=100, burst=100)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def call():
+        barrier.wait()
+        results.append(gateway.info("AAPL"))
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert source.calls == 1
+    assert gateway.stats()["coalesced"] == 7
+    assert len(results) == 8 and all(result == results[0] for result in results)
+
+
+def test_transient_failures_are_retried():
+    source = Failing(2)
+    gateway = Gateway(source, retries=3, backoff=0)
+
+    assert gateway.info("AAPL")["symbol"] == "AAPL"
+    assert source.calls == 3
+    assert gateway.stats()["retried"] == 2
+
+
+def test_permanent_errors_are_not_retried():
+    source = Failing(5, error=KeyError)
+    gateway = Gateway(source, retries=3, backoff=0)
+
+    with pytest.raises(KeyError):
+        gateway.info("AAPL")
+    assert source.calls == 1
+
+
+def test_circuit_opens_after_repeated_failures():
+    source = FlakySource(latency=0, jitter=0, error_rate=0)
+    source.down = True
+    gateway = Gateway(source, retries=0, backoff=0, failure_threshold=3, cooldown=60)
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            gateway.info("AAPL")
+    with pytest.raises(UpstreamUnavailable):
+        gateway.info("AAPL")
+
+    assert source.calls == 3
+    assert gateway.stats()["rejected"] == 1
+    assert not gateway.stats()["available"]
+
+
+def test_check_fails_until_a_request_succeeds_again():
+    source = FlakySource(latency=0, jitter=0, error_rate=0)
+    gateway = Gateway(source, retries=0, backoff=0, failure_threshold=100)
+    gateway.check()
+
+    source.down = True
+    with pytest.raises(ConnectionError):
+        gateway.info("AAPL")
+    with pytest.raises(UpstreamUnavailable):
+        gateway.check()
+    assert source.calls == 1
+
+    source.down = False
+    gateway.info("AAPL")
+    gateway.check()
+
+
+@pytest.fixture
+def flaky_store(tmp_path):
+    source = FlakySource(latency=0, jitter=0, error_rate=0)
+    return source, BarStore(tmp_path, Gateway(source, retries=0, backoff=0, failure_threshold=100))
+
+
+def expire(cache, key):
+    cache.put(key, cache.peek(key), 0)
+
+
+def test_fetch_info_serves_stale_data_when_upstream_is_down(flaky_store):
+    source, store = flaky_store
+    cache = DataCache()
+    fresh = fetch_info("AAPL", cache, store)
+
+    source.down = True
+    expire(cache, ("fundamentals", "AAPL"))
+    stale = fetch_info("AAPL", cache, store)
+
+    assert stale["longName"] == fresh["longName"]
+    assert stale["currentPrice"] == fresh["currentPrice"]
+    with pytest.raises(ConnectionError):
+        fetch_info("MSFT", cache, store)
+
+
+def test_fetch_history_falls_back_to_memory_then_disk(flaky_store):
+    source, store = flaky_store
+    cache = DataCache()
+    fresh = fetch_history("AAPL", "1mo", cache, store)
+
+    source.down = True
+    expire(cache, ("history", "AAPL", "1d"))
+    from_memory = fetch_history("AAPL", "1mo", cache, store)
+    # A new process: nothing in memory, bars only on disk
+    from_disk = fetch_history("AAPL", "1mo", DataCache(), store)
+
+    assert len(from_memory) == len(fresh) and from_memory.ts[-1] == fresh.ts[-1]
+    assert len(from_disk) == len(fresh) and from_disk.ts[-1] == fresh.ts[-1]
+    with pytest.raises(ConnectionError):
+        fetch_history("MSFT", "1mo", DataCache(), store)
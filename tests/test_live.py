@@ -0,0 +1,81 @@
+"""Live ticks replayed through the stream and folded into cached bars."""
+import numpy as np
+import pandas as pd
+
+from cache import DataCache, sizeof
+from fetcher import fold_tick
+from series import BarSeries
+from streaming import LiveStream, ReplaySource
+
+NY = "America/New_York"
+KEY = ("history", "AAPL", "60m")
+
+
+def hourly_bars(day):
+    # Laid out like Yahoo's US 60m bars: the first starts at the open, so they all start at :30
+    index = pd.date_range(f"{day} 09:30", periods=7, freq="h", tz=NY)
+    prices = np.linspace(100, 106, len(index))
+    return pd.DataFrame({"Open": prices, "High": prices + 1, "Low": prices - 1, "Close": prices,
+                         "Volume": np.full(len(index), 1000)}, index=index)
+
+
+def replay(ticks):
+    # Every tick the stream buffered, oldest first
+    frame = pd.DataFrame({"Close": [price for _, price in ticks]},
+                         index=pd.DatetimeIndex([pd.Timestamp(when, tz=NY) for when, _ in ticks]))
+    stream = LiveStream(ReplaySource({"AAPL": frame}, speed=1e9))
+    stream.start(["AAPL"])
+    stream.thread.join(5)
+    ts, price, _ = stream.ticks("AAPL")
+    return [(pd.Timestamp(t, unit="s", tz="UTC").value, p) for t, p in zip(ts, price)]
+
+
+def test_ticks_fold_into_bars_on_the_sessions_grid():
+    cache = DataCache()
+    cache.put(KEY, ("5d", BarSeries.from_frame(hourly_bars("2024-06-27"))), 60)
+    ticks = replay([
+        ("2024-06-28 09:15", 90.0),   # pre-market
+        ("2024-06-28 09:30", 107.0),
+        ("2024-06-28 09:59", 109.0),
+        ("2024-06-28 10:29", 108.0),
+        ("2024-06-28 10:30", 110.0),
+        ("2024-06-28 16:05", 120.0),  # after hours
+    ])
+
+    for ts, price in ticks:
+        fold_tick("AAPL", "5d", ts, price, cache)
+
+    series = cache.peek(KEY)[1]
+    index = series.index
+    assert list(index[-3:]) == [pd.Timestamp(t, tz=NY) for t in
+                                ("2024-06-27 15:30", "2024-06-28 09:30", "2024-06-28 10:30")]
+    assert (series.open[-2], series.high[-2], series.low[-2], series.close[-2]) == (107, 109, 107, 108)
+    assert (series.open[-1], series.high[-1], series.low[-1], series.close[-1]) == (110, 110, 110, 110)
+
+
+def test_folding_leaves_the_series_other_threads_hold_alone():
+    cache = DataCache()
+    original = BarSeries.from_frame(hourly_bars("2024-06-27"))
+    cache.put(KEY, ("5d", original), 60)
+    reader = original.window("5d")
+    ts = pd.Timestamp("2024-06-27 15:45", tz=NY).value
+
+    updated = fold_tick("AAPL", "5d", ts, 200.0, cache)
+    appended = fold_tick("AAPL", "5d", ts + pd.Timedelta(hours=18).value, 201.0, cache)
+
+    assert updated.close[-1] == 200 and len(updated) == 7
+    assert appended.close[-1] == 201 and len(appended) == 8
+    assert reader.close[-1] == 106 and len(reader) == 7
+    assert cache.stats()["bytes"] == sizeof(cache.peek(KEY))
+
+
+def test_a_fold_never_overwrites_bars_fetched_meanwhile():
+    cache = DataCache()
+    cache.put(KEY, ("5d", BarSeries.from_frame(hourly_bars("2024-06-27"))), 60)
+    stale = cache.peek(KEY)
+    folded = ("5d", stale[1].fold_tick(stale[1].ts[-1], 200.0))
+
+    fetched = cache.put(KEY, ("5d", BarSeries.from_frame(hourly_bars("2024-06-28"))), 60)
+
+    assert not cache.replace(KEY, stale, folded)
+    assert cache.peek(KEY) is fetched
@@ -0,0 +1,70 @@
+"""News polling and delivery against the offline stub source."""
+import threading
+
+from data_source import StubSource
+from message_bus import BACKGROUND, NORMAL, MessageBus
+from news import NewsService
+
+
+def service(source, busy=None):
+    bus = MessageBus(capacity=1)
+    bus.register("news", BACKGROUND, coalesce="drop")
+    return bus, NewsService(bus, source, busy=busy)
+
+
+def wait_for_poll(news):
+    news.poller.submit(lambda: None).result(5)
+
+
+def test_syndicated_stories_are_shown_once():
+    bus, news = service(StubSource(end="2024-06-28 16:00"))
+
+    news.refresh(["AAPL", "MSFT"])
+    news.executor.shutdown(wait=True)
+
+    assert bus.pop() == ("news", None)
+    items = news.take()
+    # Market-wide stories come back for both symbols but are only shown once
+    assert len(items) == len({item.digest for item in items}) == 7 + 13 + 13
+    assert sum("/news/market/" in item.url for item in items) == 7
+    assert news.take() == []
+    assert len(news.latest("MSFT", 50)) == 20
+
+
+def test_stories_wait_until_taken_even_if_the_message_is_dropped():
+    bus, news = service(StubSource(end="2024-06-28 16:00"))
+    bus.register("fetch_result", NORMAL)
+    news.refresh(["AAPL"])
+    news.executor.shutdown(wait=True)
+
+    # A more important message needs the room, evicting the news signal
+    bus.put(("fetch_result", None))
+    assert bus.stats()["dropped"] == 1
+
+    assert len(news.take()) == 20
+
+
+class UserActivity:
+    # Each news request is followed by a burst of user requests lasting `seconds`
+    def __init__(self, source, seconds=0.2):
+        self.source = source
+        self.seconds = seconds
+        self.busy = threading.Event()
+
+    def news(self, symbol, count=20):
+        self.busy.set()
+        threading.Timer(self.seconds, self.busy.clear).start()
+        return self.source.news(symbol, count)
+
+
+def test_poll_gives_way_to_user_requests_symbol_by_symbol():
+    source = UserActivity(StubSource(end="2024-06-28 16:00"))
+    _, news = service(source, busy=source.busy.is_set)
+
+    news.poll(["AAPL", "MSFT", "NVDA"])
+    wait_for_poll(news)
+
+    assert [call[1] for call in source.source.calls] == ["AAPL", "MSFT", "NVDA"]
+    assert news.deferred >= 2
+    assert not news.polling
+    news.shutdown()
@@ -0,0 +1,161 @@
+"""The HTTP API end to end, on an ephemeral port against the offline stub source."""
+import asyncio
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+from advisor import AdvisorCore
+from bar_store import BarStore
+from cache import DataCache
+from data_source import StubSource
+from server import AdvisorServer
+
+
+@pytest.fixture
+def server(tmp_path):
+    core = AdvisorCore(DataCache(), BarStore(tmp_path, StubSource(end="2024-06-28 16:00")))
+    server = AdvisorServer(core, port=0, workers=4)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result(5)
+    yield server
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+
+
+def call(server, method, target, body=None, headers=None):
+    connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=10)
+    try:
+        connection.request(method, target, body=body, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def raw(server, request):
+    # Bytes http.client refuses to send
+    with socket.create_connection(("127.0.0.1", server.port), timeout=10) as sock:
+        sock.sendall(request)
+        response = b""
+        while chunk := sock.recv(65536):
+            response += chunk
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def chat(server, message, symbol="AAPL"):
+    return call(server, "POST", "/chat", json.dumps({"symbol": symbol, "message": message}),
+                {"Content-Type": "application/json"})
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("price of msft", "MSFT"),
+    ("price of nflx", "NFLX"),
+    ("is nflx a buy?", "NFLX"),
+    ("HOLD OR SELL AMD", "AMD"),
+    ("what is apple trading at?", "AAPL"),
+    ("what's the price?", "TSLA"),
+])
+def test_chat_answers_about_the_symbol_the_message_names(server, message, expected):
+    status, payload = chat(server, message, symbol="TSLA")
+
+    assert status == 200
+    assert payload["symbol"] == expected
+    assert expected in payload["response"]
+
+
+def test_chat_price_comes_from_the_source(server):
+    price = server.core.store.source.info("MSFT")["currentPrice"]
+
+    status, payload = chat(server, "price of msft")
+
+    assert status == 200
+    assert payload["response"].startswith(f"The current price of MSFT is ${price:,.2f}")
+
+
+def test_quote(server):
+    info = server.core.store.source.info("AAPL")
+
+    status, payload = call(server, "GET", "/quote?symbol=aapl")
+
+    assert status == 200
+    assert payload["symbol"] == "AAPL"
+    assert payload["price"] == info["currentPrice"]
+    assert payload["previous_close"] == info["previousClose"]
+
+
+def test_history(server):
+    status, payload = call(server, "GET", "/history?symbol=AAPL&period=1mo")
+
+    assert status == 200
+    assert payload["symbol"] == "AAPL" and payload["period"] == "1mo"
+    assert len(payload["timestamps"]) > 15
+    assert {"open", "high", "low", "close", "volume"} <= payload.keys()
+    assert all(len(payload[column]) == len(payload["timestamps"]) for column in ("open", "close", "volume"))
+    assert payload["timestamps"][-1].startswith("2024-06-28")
+
+
+def test_indicators(server):
+    status, payload = call(server, "GET", "/indicators?symbol=AAPL&period=6mo&names=sma,rsi,macd")
+
+    assert status == 200
+    assert set(payload["indicators"]) == {"sma", "rsi", "macd"}
+    sma = payload["indicators"]["sma"]["sma"]
+    assert len(sma) == len(payload["timestamps"])
+    # Warm-up bars have no value, and come back as null rather than NaN
+    assert sma[0] is None and sma[-1] is not None
+
+
+def test_recommendation(server):
+    status, payload = call(server, "GET", "/recommendation?symbol=MSFT")
+
+    assert status == 200
+    assert payload["recommendation"] in {"Strong Buy", "Buy", "Hold", "Sell", "Strong Sell"}
+    assert payload["reason"]
+
+
+@pytest.mark.parametrize("target, error", [
+    ("/quote", "Missing 'symbol' parameter"),
+    ("/history?symbol=AAPL&period=7wk", "Unknown period: 7wk"),
+    ("/indicators?symbol=AAPL&names=sma,foo", "Unknown indicators: foo"),
+])
+def test_bad_parameters_are_a_400(server, target, error):
+    status, payload = call(server, "GET", target)
+
+    assert status == 400
+    assert payload["error"] == error
+
+
+def test_chat_without_a_message_is_a_400(server):
+    status, payload = chat(server, "  ")
+
+    assert status == 400
+    assert payload["error"] == "Missing 'message' parameter"
+
+
+def test_a_body_that_is_not_json_is_a_400(server):
+    status, payload = call(server, "POST", "/chat", "price?")
+
+    assert status == 400
+    assert payload["error"] == "Body must be a JSON object"
+
+
+def test_an_invalid_content_length_is_a_400(server):
+    status, payload = raw(server, b"POST /chat HTTP/1.1\r\nHost: x\r\nContent-Length: ten\r\n\r\n")
+
+    assert status == 400
+    assert payload["error"] == "Invalid Content-Length"
+
+
+def test_unknown_route_is_a_404(server):
+    status, payload = call(server, "GET", "/nope")
+
+    assert status == 404
+    assert payload["error"] == "No route for GET /nope"